@@ -1,28 +1,83 @@
-from fastapi import APIRouter, HTTPException, Query
-from schemas.alpha_view.models import TokenRequest, TokenMessage, TokenMessagesResponse
+import asyncio
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from schemas.alpha_view.models import (
+    AckRequest,
+    TokenCursorResponse,
+    TokenRequest,
+    TokenMessagesResponse,
+    TokenPageResponse,
+)
 from services.alpha_view.queue_service import (
     enqueue_token_data,
+    enqueue_token_data_batch,
+    get_queue_stats,
     dequeue_token_data,
     get_token_data_after_timestamp,
+    get_token_data_after_cursor,
+    get_latest_cursor,
+    query_token_data,
+    consume_token_data,
+    ack_token_data,
+    remove_consumer_group,
+    get_consumer_groups,
+    wait_for_token_data_after_cursor,
     get_all_token_data,
-    format_token_message,
+    build_token_messages,
+    get_cached_response_body,
+)
+from services.alpha_view.constants import (
+    LONG_POLL_DEFAULT_TIMEOUT,
+    LONG_POLL_MAX_TIMEOUT,
+    STREAM_HEARTBEAT_SECONDS,
 )
 from typing import List, Optional
 from datetime import datetime, timezone, timedelta
 
-
 router = APIRouter()
 
 
 @router.post("/enqueue")
 def enqueue_token(request: TokenRequest):
     try:
-        enqueue_token_data(request)
-        return {"status": "success", "message": "Data enqueued successfully"}
+        seq, merged = enqueue_token_data(request)
+        return {
+            "status": "success",
+            "message": (
+                "Data merged into a recent alert"
+                if merged
+                else "Data enqueued successfully"
+            ),
+            "seq": seq,
+            "merged": merged,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/enqueue-batch")
+def enqueue_token_batch(requests: List[TokenRequest]):
+    try:
+        results = enqueue_token_data_batch(requests)
+        enqueued = sum(1 for _, merged in results if not merged)
+        return {
+            "status": "success",
+            "message": f"{enqueued} entries enqueued successfully",
+            "seqs": [seq for seq, _ in results],
+            "merged": [merged for _, merged in results],
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/stats")
+def get_stats():
+    """
+    Queue write counters, including enqueue throughput in enqueues/second.
+    """
+    return get_queue_stats()
+
+
 @router.get("/dequeue", response_model=TokenMessagesResponse)
 def dequeue_tokens(clear_queue: bool = False) -> TokenMessagesResponse:
     """
@@ -33,16 +88,57 @@ def dequeue_tokens(clear_queue: bool = False) -> TokenMessagesResponse:
     """
     try:
         if clear_queue:
-            data = dequeue_token_data()  # Original behavior that clears the queue
-        else:
-            data = get_all_token_data()  # New behavior that keeps the queue intact
+            # Moves the log start past the returned entries; nothing is truncated
+            data = dequeue_token_data()
+            return TokenMessagesResponse(messages=build_token_messages(data))
+
+        # New behavior that keeps the queue intact, served from the response cache
+        body = get_cached_response_body(
+            ("all",),
+            lambda: TokenMessagesResponse(
+                messages=build_token_messages(get_all_token_data())
+            ),
+        )
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/tokens", response_model=TokenPageResponse)
+def get_tokens(
+    chain: Optional[str] = Query(
+        None, description="Chain ID or chain name (case-insensitive)"
+    ),
+    min_fdv: Optional[float] = Query(None, ge=0, description="Minimum FDV"),
+    max_fdv: Optional[float] = Query(None, ge=0, description="Maximum FDV"),
+    min_amount: Optional[int] = Query(
+        None, ge=0, description="Minimum number of smart wallets"
+    ),
+    offset: int = Query(0, ge=0, description="Number of matching entries to skip"),
+    limit: Optional[int] = Query(
+        None, ge=1, description="Maximum number of entries to return"
+    ),
+) -> TokenPageResponse:
+    """
+    Retrieve queued token data filtered and paginated on the server, without
+    clearing the queue. Filters are combined with AND.
+    """
+    try:
 
-        # Format each token entry as a message
-        token_messages = [
-            TokenMessage(message=format_token_message(item), data=item) for item in data
-        ]
+        def build() -> TokenPageResponse:
+            data, total = query_token_data(
+                chain, min_fdv, max_fdv, min_amount, offset, limit
+            )
+            return TokenPageResponse(
+                messages=build_token_messages(data),
+                total=total,
+                offset=offset,
+                limit=limit,
+            )
 
-        return TokenMessagesResponse(messages=token_messages)
+        key = ("tokens", chain, min_fdv, max_fdv, min_amount, offset, limit)
+        body = get_cached_response_body(key, build)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -59,6 +155,9 @@ def get_tokens_after_timestamp(
     If no timestamp is provided, defaults to 1 minute ago.
     """
     try:
+        # Explicit timestamps are stable windows, so their responses are cacheable
+        cacheable = bool(timestamp)
+
         # Default to 1 minute ago if no timestamp provided
         if not timestamp:
             # Get current time and subtract 1 minute
@@ -74,13 +173,177 @@ def get_tokens_after_timestamp(
                 detail="Invalid timestamp format. Use ISO format (YYYY-MM-DDTHH:MM:SS.sssZ)",
             )
 
-        data = get_token_data_after_timestamp(timestamp)
+        def build() -> TokenMessagesResponse:
+            data = get_token_data_after_timestamp(timestamp)
+            return TokenMessagesResponse(messages=build_token_messages(data))
+
+        if not cacheable:
+            return build()
+
+        body = get_cached_response_body(("after-timestamp", timestamp), build)
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/tokens-after-cursor", response_model=TokenCursorResponse)
+def get_tokens_after_cursor(
+    cursor: int = Query(
+        0, ge=0, description="Sequence number of the first entry to return"
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, description="Maximum number of entries to return"
+    ),
+) -> TokenCursorResponse:
+    """
+    Retrieve token data from the given cursor on with formatted messages.
+
+    Pass the returned `next_cursor` on the next call to receive only new entries,
+    without duplicates or gaps.
+    """
+    try:
+
+        def build() -> TokenCursorResponse:
+            data, next_cursor = get_token_data_after_cursor(cursor, limit)
+            return TokenCursorResponse(
+                messages=build_token_messages(data), next_cursor=next_cursor
+            )
+
+        body = get_cached_response_body(("after-cursor", cursor, limit), build)
+        return Response(content=body, media_type="application/json")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/consume", response_model=TokenCursorResponse)
+def consume_tokens(
+    group: str = Query(..., min_length=1, description="Consumer group name"),
+    limit: Optional[int] = Query(
+        None, ge=1, description="Maximum number of entries to return"
+    ),
+) -> TokenCursorResponse:
+    """
+    Retrieve token data the consumer group has not acknowledged yet.
+
+    The group's offset only moves when `next_cursor` is posted to /ack, so
+    entries are delivered again if the consumer fails before acknowledging.
+    """
+    try:
+        data, next_cursor = consume_token_data(group, limit)
+        return TokenCursorResponse(
+            messages=build_token_messages(data), next_cursor=next_cursor
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/ack")
+def ack_tokens(request: AckRequest):
+    """
+    Acknowledge every entry before `cursor` for the consumer group.
+    """
+    try:
+        committed = ack_token_data(request.group, request.cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"status": "success", "group": request.group, "committed": committed}
+
+
+@router.get("/consumers")
+def get_consumers():
+    """
+    Committed offset and lag of each consumer group.
+    """
+    return get_consumer_groups()
+
+
+@router.delete("/consumers/{group}")
+def delete_consumer(group: str):
+    """
+    Unregister a consumer group so it no longer holds back compaction.
+    """
+    if not remove_consumer_group(group):
+        raise HTTPException(status_code=404, detail=f"Unknown consumer group: {group}")
+    return {"status": "success", "group": group}
+
 
-        # Format each token entry as a message
-        token_messages = [
-            TokenMessage(message=format_token_message(item), data=item) for item in data
-        ]
+@router.get("/poll", response_model=TokenCursorResponse)
+async def poll_tokens(
+    cursor: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Sequence number of the first entry to return. Defaults to new entries only",
+    ),
+    timeout: float = Query(
+        LONG_POLL_DEFAULT_TIMEOUT,
+        ge=0,
+        le=LONG_POLL_MAX_TIMEOUT,
+        description="Seconds to wait for new entries before returning an empty list",
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, description="Maximum number of entries to return"
+    ),
+) -> TokenCursorResponse:
+    """
+    Long-poll for token data: returns as soon as entries at or after the cursor
+    exist, or an empty list once the timeout expires.
+    """
+    try:
+        if cursor is None:
+            cursor = await asyncio.to_thread(get_latest_cursor)
 
-        return TokenMessagesResponse(messages=token_messages)
+        data, next_cursor = await wait_for_token_data_after_cursor(
+            cursor, timeout, limit
+        )
+
+        return TokenCursorResponse(
+            messages=build_token_messages(data), next_cursor=next_cursor
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stream")
+async def stream_tokens(
+    request: Request,
+    cursor: Optional[int] = Query(
+        None,
+        ge=0,
+        description="Sequence number of the first entry to send. Defaults to new entries only",
+    ),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events stream of formatted token alerts.
+
+    Each event carries the entry's sequence number as its id, so a reconnecting
+    client resumes from its `Last-Event-ID` without gaps or duplicates.
+    """
+    if last_event_id and last_event_id.isdigit():
+        cursor = int(last_event_id) + 1
+    elif cursor is None:
+        cursor = await asyncio.to_thread(get_latest_cursor)
+
+    async def events(cursor: int):
+        while not await request.is_disconnected():
+            data, cursor = await wait_for_token_data_after_cursor(
+                cursor, STREAM_HEARTBEAT_SECONDS
+            )
+            if not data:
+                yield ": keep-alive\n\n"
+                continue
+
+            for token_message in build_token_messages(data):
+                yield (
+                    f"id: {token_message.data['seq']}\n"
+                    f"event: token\n"
+                    f"data: {token_message.model_dump_json()}\n\n"
+                )
+
+    return StreamingResponse(
+        events(cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from schemas.mindai_schemas.best_call_schemas import BestCallResponse
 from schemas.mindai_schemas.mentioned_tokens_schemas import TopMentionedTokensResponse
 from schemas.mindai_schemas.top_gainers_token_schema import TopGainersTokenResponse
@@ -9,15 +9,26 @@ from schemas.mindai_schemas.process_query_schema import (
     ProcessQueryResponse,
     QueryPayload,
 )
-from services.mindai.query_processor import process_query as process_query_func
+from services.mindai.query_processor import MindAIQueryEngine
 from typing import Optional, List
 
 router = APIRouter()
-mindai_service = MindAIService()
+
+
+def get_query_engine(request: Request) -> MindAIQueryEngine:
+    """Returns the query engine created once at application startup."""
+    return request.app.state.query_engine
+
+
+def get_mindai_service(
+    engine: MindAIQueryEngine = Depends(get_query_engine),
+) -> MindAIService:
+    """Returns the engine's service so routes share its connection pool and cache."""
+    return engine.service
 
 
 @router.get("/top-kols", response_model=TopKolsResponse)
-def get_top_kols(
+async def get_top_kols(
     period: int = Query(
         24, description="Filter the time period (1-720 hours) for the data end point"
     ),
@@ -26,17 +37,18 @@ def get_top_kols(
         None,
         description="Filter calls by the token category. Available values: top100, top500, lowRank",
     ),
+    mindai_service: MindAIService = Depends(get_mindai_service),
 ):
     """
     Fetches top performing KOLs based on the specified parameters.
     """
-    return mindai_service.get_top_kols(
+    return await mindai_service.get_top_kols(
         period=period, kolsAmount=kolsAmount, tokenCategory=tokenCategory
     )
 
 
 @router.get("/top-gainers", response_model=TopGainersTokenResponse)
-def get_top_gainers(
+async def get_top_gainers(
     period: int = Query(
         24, description="Filter the time period (1-720 hours) for the data end point"
     ),
@@ -49,11 +61,12 @@ def get_top_gainers(
         description="Sorting criteria for token calls based on ROA at current price or ROA at ATH",
     ),
     kolsAmount: int = Query(3, description="Number of KOLs to return per token"),
+    mindai_service: MindAIService = Depends(get_mindai_service),
 ):
     """
     Fetches top gainer tokens based on the specified parameters.
     """
-    return mindai_service.get_top_gainers_token(
+    return await mindai_service.get_top_gainers_token(
         period=period,
         tokensAmount=tokensAmount,
         kolsAmount=kolsAmount,
@@ -63,7 +76,7 @@ def get_top_gainers(
 
 
 @router.get("/top-mentioned-tokens", response_model=TopMentionedTokensResponse)
-def get_top_mentioned_tokens(
+async def get_top_mentioned_tokens(
     period: int = Query(
         24, description="Filter the time period (1-720 hours) for the data end point"
     ),
@@ -73,41 +86,53 @@ def get_top_mentioned_tokens(
         None,
         description="Filter tokens by category. Available values: top100, top500, lowRank",
     ),
+    mindai_service: MindAIService = Depends(get_mindai_service),
 ):
     """
     Fetches the most mentioned tokens based on the specified parameters.
     """
-    return mindai_service.get_top_mentioned_tokens(
+    return await mindai_service.get_top_mentioned_tokens(
         period=period, tokensAmount=tokensAmount, kols=kols, tokenCategory=tokenCategory
     )
 
 
 @router.get("/best-call", response_model=BestCallResponse)
-def get_best_call(
+async def get_best_call(
     period: Optional[str] = Query(None, description="Time period: day, week, etc."),
     influencer_twitter_username: Optional[str] = Query(
         None, description="Twitter username of influencer"
     ),
     coin_symbol: Optional[str] = Query(None, description="Coin symbol"),
+    mindai_service: MindAIService = Depends(get_mindai_service),
 ):
     """
     Fetches the best call based on optional filters.
     """
-    return mindai_service.fetch_best_call(
+    return await mindai_service.fetch_best_call(
         period=period,
         influencer_twitter_username=influencer_twitter_username,
         coin_symbol=coin_symbol,
     )
 
 
+@router.get("/cache-stats")
+def get_cache_stats(mindai_service: MindAIService = Depends(get_mindai_service)):
+    """
+    Returns hit/miss counters of the upstream response cache.
+    """
+    return mindai_service.cache_stats()
+
+
 @router.post("/process", response_model=ProcessQueryResponse)
-async def process_query_endpoint(payload: QueryPayload):
+async def process_query_endpoint(
+    payload: QueryPayload, engine: MindAIQueryEngine = Depends(get_query_engine)
+):
     """
     Processes a query by calling process_query(query_type, params)
     and returns the resulting message in the 'message' field.
     """
     try:
-        result = await process_query_func(payload.query_type, payload.params)
+        result = await engine.process_query(payload.query_type, payload.params)
         return ProcessQueryResponse(message=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
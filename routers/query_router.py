@@ -1,22 +1,73 @@
-from fastapi import APIRouter, HTTPException
-from schemas.query_service_schemas.query_schemas import QueryRequest
+from fastapi import APIRouter, Depends, HTTPException, Request
+from schemas.query_service_schemas.query_schemas import AnswerResponse, QueryRequest
+from services.query_service.answer_pipeline import (
+    AnswerPipeline,
+    UnanswerableQueryError,
+)
 from services.query_service.query_processor import QueryProcessor  # ✅ Correct import
 
 router = APIRouter()
-query_processor = QueryProcessor()
+
+
+def get_query_processor(request: Request) -> QueryProcessor:
+    """Returns the query processor created once at application startup."""
+    return request.app.state.query_processor
+
+
+def get_answer_pipeline(request: Request) -> AnswerPipeline:
+    """Returns the answer pipeline created once at application startup."""
+    return request.app.state.answer_pipeline
 
 
 @router.post("/process_query", response_model=dict)
-async def process_query(request: QueryRequest):
+async def process_query(
+    request: QueryRequest,
+    query_processor: QueryProcessor = Depends(get_query_processor),
+):
     """
     Endpoint to process user queries using GPT-4o.
     """
     try:
-        intent, params = await query_processor.process_query(request.query)
+        intent, params, source = await query_processor.process_query_with_source(
+            request.query, request.priority
+        )
         if not intent:
             raise HTTPException(status_code=400, detail="Query could not be processed")
 
-        return {"intent": intent, "params": params}
+        # ✅ fallback: the LLM timed out or was overloaded, the intent is a default
+        return {"intent": intent, "params": params, "fallback": source == "fallback"}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/answer", response_model=AnswerResponse)
+async def answer_query(
+    request: QueryRequest,
+    answer_pipeline: AnswerPipeline = Depends(get_answer_pipeline),
+):
+    """
+    Classifies a query and returns the finished MindAI message in one call,
+    instead of /query/process_query followed by /mindai/process.
+    """
+    try:
+        return await answer_pipeline.answer(request.query, request.priority)
+    except UnanswerableQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/cache-stats")
+async def get_cache_stats(
+    query_processor: QueryProcessor = Depends(get_query_processor),
+    answer_pipeline: AnswerPipeline = Depends(get_answer_pipeline),
+):
+    """
+    Query classification cache counters, including the share of queries
+    answered without an LLM call, and the /query/answer cache counters.
+    """
+    return {
+        **query_processor.cache_stats(),
+        "answer_cache": answer_pipeline.cache_stats(),
+    }
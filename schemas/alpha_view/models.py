@@ -19,3 +19,24 @@ class TokenMessage(BaseModel):
 
 class TokenMessagesResponse(BaseModel):
     messages: List[TokenMessage]
+
+
+class TokenCursorResponse(BaseModel):
+    messages: List[TokenMessage]
+    next_cursor: int = Field(
+        ..., description="Cursor to pass on the next call to receive only newer entries"
+    )
+
+
+class TokenPageResponse(BaseModel):
+    messages: List[TokenMessage]
+    total: int = Field(..., description="Number of entries matching the filters")
+    offset: int
+    limit: Optional[int] = None
+
+
+class AckRequest(BaseModel):
+    group: str = Field(..., min_length=1, description="Consumer group name")
+    cursor: int = Field(
+        ..., ge=0, description="The next_cursor returned by /consume for the group"
+    )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 
 class QueryIntent(BaseModel):
@@ -11,7 +11,41 @@ class QueryIntent(BaseModel):
     )
 
 
+class QueryIntentBatch(BaseModel):
+    """Pydantic model for the structured output of a multi-query prompt"""
+
+    results: List[QueryIntent] = Field(
+        description="One classification per query, in the order of the queries"
+    )
+
+
 class QueryRequest(BaseModel):
     """Schema for user query input."""
 
     query: str
+    priority: int = Field(
+        0,
+        ge=0,
+        le=10,
+        description=(
+            "Scheduling priority of the LLM call if the query needs one, from 0 "
+            "(default, interactive) to 10; lower runs first. Use a positive "
+            "value for bulk or backlog queries."
+        ),
+    )
+
+
+class AnswerResponse(BaseModel):
+    """Schema for the answer to a natural-language query."""
+
+    intent: str
+    params: Dict[str, Any]
+    message: str
+    cached: bool = Field(
+        description="Whether the answer was served from the answer cache"
+    )
+    fallback: bool = Field(
+        False,
+        description="Whether the LLM timed out or was overloaded and the "
+        "intent is a fallback",
+    )
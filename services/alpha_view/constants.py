@@ -0,0 +1,55 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Shared queue file path; segments are stored in a directory next to it
+QUEUE_PATH = r"services/alpha_view/alpha_queue.jsonl"
+
+# Segmented log settings
+QUEUE_SEGMENT_MAX_BYTES = int(
+    os.getenv("ALPHA_QUEUE_SEGMENT_MAX_BYTES", 4 * 1024 * 1024)
+)
+QUEUE_INDEX_INTERVAL_BYTES = int(os.getenv("ALPHA_QUEUE_INDEX_INTERVAL_BYTES", 4096))
+QUEUE_MAX_SEGMENTS = int(os.getenv("ALPHA_QUEUE_MAX_SEGMENTS", 8))
+QUEUE_RETENTION_SECONDS = (
+    float(os.getenv("ALPHA_QUEUE_RETENTION_SECONDS"))
+    if os.getenv("ALPHA_QUEUE_RETENTION_SECONDS")
+    else None
+)
+
+# On-disk record format of new segments: "jsonl" or "binary". Convert existing
+# segments with `python -m services.alpha_view.migrate_queue`
+QUEUE_RECORD_FORMAT = os.getenv("ALPHA_QUEUE_RECORD_FORMAT", "jsonl")
+
+# Long-poll and streaming settings (seconds)
+LONG_POLL_DEFAULT_TIMEOUT = float(os.getenv("ALPHA_LONG_POLL_DEFAULT_TIMEOUT", 30))
+LONG_POLL_MAX_TIMEOUT = float(os.getenv("ALPHA_LONG_POLL_MAX_TIMEOUT", 60))
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("ALPHA_STREAM_HEARTBEAT_SECONDS", 15))
+
+# Group commit durability: "always", "interval" or "never"
+QUEUE_FSYNC_POLICY = os.getenv("ALPHA_QUEUE_FSYNC_POLICY", "interval")
+QUEUE_FSYNC_INTERVAL = float(os.getenv("ALPHA_QUEUE_FSYNC_INTERVAL", 1.0))
+
+# Number of recent entries kept parsed in memory
+QUEUE_RECENT_CAPACITY = int(os.getenv("ALPHA_QUEUE_RECENT_CAPACITY", 10000))
+
+# Cached response bodies for alpha read endpoints
+RESPONSE_CACHE_SIZE = int(os.getenv("ALPHA_RESPONSE_CACHE_SIZE", 256))
+RESPONSE_CACHE_TTL = int(os.getenv("ALPHA_RESPONSE_CACHE_TTL", 300))
+
+# Share the queue safely between uvicorn worker processes
+QUEUE_MULTIPROCESS = os.getenv("ALPHA_QUEUE_MULTIPROCESS", "true").lower() == "true"
+
+# Waiters re-check the log at least this often, to see entries enqueued by other workers
+QUEUE_POLL_INTERVAL = float(os.getenv("ALPHA_QUEUE_POLL_INTERVAL", 1.0))
+
+# Optional coalescing of repeated alerts for the same (chain, tokenAddress).
+# Updates within the window are merged unless amount or FDV moved past a threshold.
+# The index is kept per worker process.
+DEDUP_ENABLED = os.getenv("ALPHA_DEDUP_ENABLED", "false").lower() == "true"
+DEDUP_WINDOW_SECONDS = float(os.getenv("ALPHA_DEDUP_WINDOW_SECONDS", 300))
+DEDUP_AMOUNT_DELTA = int(os.getenv("ALPHA_DEDUP_AMOUNT_DELTA", 3))
+DEDUP_FDV_CHANGE = float(os.getenv("ALPHA_DEDUP_FDV_CHANGE", 0.25))
+DEDUP_MAX_KEYS = int(os.getenv("ALPHA_DEDUP_MAX_KEYS", 10000))
@@ -0,0 +1,33 @@
+"""
+Converts the alpha queue log between the JSONL and binary record formats.
+
+Stop the API workers first: they keep the current segment files open.
+
+    python -m services.alpha_view.migrate_queue --to binary
+"""
+
+import argparse
+
+from services.alpha_view.constants import QUEUE_PATH
+from utils.file_queue import RECORD_FORMATS, FileQueue
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--to", choices=RECORD_FORMATS, default="binary")
+    parser.add_argument("--path", default=QUEUE_PATH, help="queue file path")
+    args = parser.parse_args()
+
+    queue = FileQueue(args.path, recent_capacity=0, record_format=args.to)
+    result = queue.convert_segments(args.to)
+    queue.close()
+
+    print(
+        f"Converted {result['converted']} of {len(queue.segments)} segments to "
+        f"{args.to}: {result['bytes_before']:,} -> {result['bytes_after']:,} bytes"
+    )
+    print(f"Set ALPHA_QUEUE_RECORD_FORMAT={args.to} before restarting the API.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,240 @@
-from schemas.alpha_view.models import TokenRequest
+import asyncio
+import threading
+from itertools import zip_longest
+from pydantic import BaseModel
+from schemas.alpha_view.models import TokenMessage, TokenRequest
+from services.alpha_view.token_index import TokenIndex
+from services.alpha_view.constants import (
+    DEDUP_AMOUNT_DELTA,
+    DEDUP_ENABLED,
+    DEDUP_FDV_CHANGE,
+    DEDUP_MAX_KEYS,
+    DEDUP_WINDOW_SECONDS,
+    QUEUE_FSYNC_INTERVAL,
+    QUEUE_FSYNC_POLICY,
+    QUEUE_INDEX_INTERVAL_BYTES,
+    QUEUE_MAX_SEGMENTS,
+    QUEUE_MULTIPROCESS,
+    QUEUE_PATH,
+    QUEUE_POLL_INTERVAL,
+    QUEUE_RECENT_CAPACITY,
+    QUEUE_RECORD_FORMAT,
+    QUEUE_RETENTION_SECONDS,
+    QUEUE_SEGMENT_MAX_BYTES,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
+)
+from utils.async_notifier import AsyncNotifier
 from utils.file_queue import FileQueue
-from typing import List, Dict
+from utils.ttl_cache import FRESH, TTLCache
+from typing import Callable, List, Dict, Optional, Tuple
 
-# Use a shared queue file path
-QUEUE_PATH = r"services/alpha_view/alpha_queue.jsonl"
+file_queue = FileQueue(
+    QUEUE_PATH,
+    segment_max_bytes=QUEUE_SEGMENT_MAX_BYTES,
+    index_interval_bytes=QUEUE_INDEX_INTERVAL_BYTES,
+    max_segments=QUEUE_MAX_SEGMENTS,
+    retention_seconds=QUEUE_RETENTION_SECONDS,
+    fsync_policy=QUEUE_FSYNC_POLICY,
+    fsync_interval=QUEUE_FSYNC_INTERVAL,
+    recent_capacity=QUEUE_RECENT_CAPACITY,
+    multiprocess=QUEUE_MULTIPROCESS,
+    record_format=QUEUE_RECORD_FORMAT,
+)
 
-file_queue = FileQueue(QUEUE_PATH)
+# Secondary indexes on chain, FDV and amount for filtered reads
+token_index = TokenIndex(file_queue)
 
+# Wakes long-poll and stream subscribers when new token data is enqueued in this
+# process; entries from other workers are picked up every QUEUE_POLL_INTERVAL
+queue_notifier = AsyncNotifier()
 
-def enqueue_token_data(token: TokenRequest):
-    """Enqueue token data into the queue file with timestamp."""
+# Alert messages rendered once at enqueue time, keyed by sequence number
+message_cache = TTLCache(max_size=QUEUE_RECENT_CAPACITY)
+
+# Serialized read responses, keyed by request and the queue head they reflect
+response_cache = TTLCache(max_size=RESPONSE_CACHE_SIZE)
+
+# Last emitted alert per (chain, tokenAddress), expiring after the dedup window
+dedup_index = TTLCache(max_size=DEDUP_MAX_KEYS)
+dedup_lock = threading.Lock()
+dedup_stats = {"emitted": 0, "merged": 0}
+
+
+def _dedup_key(data: Dict) -> Tuple[str, str]:
+    return str(data["chain"]), data["tokenAddress"]
+
+
+def _crosses_threshold(alert: Dict, data: Dict) -> bool:
+    """True if the update moved amount or FDV enough since the last emitted alert."""
+    if abs(data["amount"] - alert["amount"]) >= DEDUP_AMOUNT_DELTA:
+        return True
+    if not alert["fdv"]:
+        return data["fdv"] != alert["fdv"]
+    return abs(data["fdv"] - alert["fdv"]) / alert["fdv"] >= DEDUP_FDV_CHANGE
+
+
+def _filter_duplicates(
+    entries: List[Dict],
+) -> Tuple[List[Optional[Dict]], List[Dict], List[Dict]]:
+    """
+    Splits entries into updates merged into a recent alert and entries to emit.
+
+    A merged update's amount and FDV are kept on the alert as its latest values;
+    the thresholds stay relative to the values the alert was emitted with.
+
+    Returns:
+        Tuple: For each entry the alert it was merged into (None if emitted), the
+        entries to enqueue, and the alerts reserved for them
+    """
+    merged_into: List[Optional[Dict]] = []
+    emitted, reserved = [], []
+    with dedup_lock:
+        for data in entries:
+            key = _dedup_key(data)
+            state, alert = dedup_index.get(key)
+            if state == FRESH and not _crosses_threshold(alert, data):
+                alert["latest_amount"] = data["amount"]
+                alert["latest_fdv"] = data["fdv"]
+                merged_into.append(alert)
+                continue
+
+            # Reserve the key before writing, so concurrent repeats merge into it;
+            # `written` is set once the alert has its seq (or failed to enqueue)
+            alert = {
+                "amount": data["amount"],
+                "fdv": data["fdv"],
+                "latest_amount": data["amount"],
+                "latest_fdv": data["fdv"],
+                "seq": None,
+                "merged": 0,
+                "written": threading.Event(),
+            }
+            dedup_index.set(key, alert, DEDUP_WINDOW_SECONDS)
+            merged_into.append(None)
+            emitted.append(data)
+            reserved.append(alert)
+    return merged_into, emitted, reserved
+
+
+def _enqueue_entries(entries: List[Dict]) -> List[Tuple[int, bool]]:
+    """Renders, enqueues and caches entries, merging repeats when dedup is enabled."""
+    reserved = []
+    if DEDUP_ENABLED:
+        merged_into, emitted, reserved = _filter_duplicates(entries)
+    else:
+        merged_into, emitted = [None] * len(entries), entries
+
+    messages = [format_token_message(data) for data in emitted]
+    seqs = []
+    try:
+        seqs = file_queue.enqueue_many(emitted)
+    finally:
+        if reserved:
+            with dedup_lock:
+                for data, alert, seq in zip_longest(emitted, reserved, seqs):
+                    alert["seq"] = seq
+                    if seq is None and dedup_index.get(_dedup_key(data))[1] is alert:
+                        # Release the key so the next update is emitted again
+                        dedup_index.delete(_dedup_key(data))
+                dedup_stats["emitted"] += len(seqs)
+            for alert in reserved:
+                alert["written"].set()
+
+    for seq, message in zip(seqs, messages):
+        message_cache.set(seq, message)
+    if seqs:
+        queue_notifier.notify()
+
+    # Pair every request with its own seq, or the seq of the alert it merged into
+    # once that alert is written
+    own = iter(seqs)
+    results: List[Optional[Tuple[int, bool]]] = []
+    retry = []
+    for data, alert in zip(entries, merged_into):
+        if alert is None:
+            results.append((next(own), False))
+            continue
+        alert["written"].wait()
+        if alert["seq"] is None:
+            # The alert it merged into was never written; emit this update instead
+            retry.append((len(results), data))
+            results.append(None)
+            continue
+        with dedup_lock:
+            alert["merged"] += 1
+            dedup_stats["merged"] += 1
+        results.append((alert["seq"], True))
+
+    if retry:
+        retried = _enqueue_entries([data for _, data in retry])
+        for (position, _), result in zip(retry, retried):
+            results[position] = result
+    return results
+
+
+def enqueue_token_data(token: TokenRequest) -> Tuple[int, bool]:
+    """
+    Enqueue token data into the queue file with timestamp and sequence number.
+
+    Returns:
+        Tuple[int, bool]: The entry's sequence number and whether it was merged
+        into a recent alert instead (then the alert's sequence number)
+    """
     data = token.model_dump()  # Updated to use model_dump instead of deprecated dict()
-    file_queue.enqueue(data)
+    return _enqueue_entries([data])[0]
+
+
+def enqueue_token_data_batch(
+    tokens: List[TokenRequest],
+) -> List[Tuple[int, bool]]:
+    """Enqueue several token entries in one group commit."""
+    return _enqueue_entries([token.model_dump() for token in tokens])
+
+
+def build_token_messages(data: List[dict]) -> List[TokenMessage]:
+    """Pair entries with their pre-rendered alert messages, rendering any missing."""
+    token_messages = []
+    for item in data:
+        state, message = message_cache.get(item["seq"])
+        if state != FRESH:
+            message = format_token_message(item)
+            message_cache.set(item["seq"], message)
+        token_messages.append(TokenMessage(message=message, data=item))
+    return token_messages
+
+
+def get_cached_response_body(key: Tuple, build: Callable[[], BaseModel]) -> bytes:
+    """
+    Returns the JSON body for a read request, building it once per queue head.
+    The key includes the head offsets, so any enqueue or removal invalidates it.
+    """
+    cache_key = (key, file_queue.head())
+    state, body = response_cache.get(cache_key)
+    if state == FRESH:
+        return body
+
+    body = build().model_dump_json().encode("utf-8")
+    response_cache.set(cache_key, body, RESPONSE_CACHE_TTL)
+    return body
+
+
+def get_queue_stats() -> Dict:
+    """Queue write counters and enqueue throughput (enqueues/second)."""
+    stats = file_queue.stats()
+    stats.update(token_index.stats())
+    with dedup_lock:
+        stats["dedup"] = {
+            "enabled": DEDUP_ENABLED,
+            "tracked_tokens": len(dedup_index),
+            **dedup_stats,
+        }
+    return stats
+
+
+def close_queue():
+    """Flush and close the queue's open segment on shutdown."""
+    file_queue.close()
 
 
 def dequeue_token_data() -> List[dict]:
@@ -24,6 +247,72 @@ def get_token_data_after_timestamp(timestamp: str) -> List[dict]:
     return file_queue.get_entries_after_timestamp(timestamp)
 
 
+def get_token_data_after_cursor(
+    cursor: int, limit: Optional[int] = None
+) -> Tuple[List[dict], int]:
+    """Retrieve token data from the given sequence number on, plus the next cursor."""
+    return file_queue.get_entries_after_offset(cursor, limit)
+
+
+def consume_token_data(
+    group: str, limit: Optional[int] = None
+) -> Tuple[List[dict], int]:
+    """Retrieve token data the consumer group has not acknowledged, plus the cursor to ack."""
+    return file_queue.consume(group, limit)
+
+
+def ack_token_data(group: str, cursor: int) -> int:
+    """Acknowledge all token data before `cursor` for the consumer group."""
+    return file_queue.ack(group, cursor)
+
+
+def remove_consumer_group(group: str) -> bool:
+    """Unregister a consumer group so its offset no longer holds back compaction."""
+    return file_queue.remove_group(group)
+
+
+def get_consumer_groups() -> Dict[str, Dict[str, int]]:
+    """Committed offset and lag of each consumer group."""
+    return file_queue.consumer_groups()
+
+
+def query_token_data(
+    chain: Optional[str] = None,
+    min_fdv: Optional[float] = None,
+    max_fdv: Optional[float] = None,
+    min_amount: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[List[dict], int]:
+    """Retrieve one page of token data matching the filters, plus the total match count."""
+    return token_index.query(chain, min_fdv, max_fdv, min_amount, offset, limit)
+
+
+def get_latest_cursor() -> int:
+    """Cursor that receives only token data enqueued from now on."""
+    return file_queue.head()[1]
+
+
+async def wait_for_token_data_after_cursor(
+    cursor: int, timeout: float, limit: Optional[int] = None
+) -> Tuple[List[dict], int]:
+    """
+    Retrieve token data from the given cursor on, waiting up to `timeout` seconds
+    for new data to be enqueued if there is none yet.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        version = queue_notifier.version
+        data, next_cursor = await asyncio.to_thread(
+            get_token_data_after_cursor, cursor, limit
+        )
+        remaining = deadline - loop.time()
+        if data or remaining <= 0:
+            return data, next_cursor
+        await queue_notifier.wait(version, min(remaining, QUEUE_POLL_INTERVAL))
+
+
 def get_all_token_data() -> List[dict]:
     """Retrieve all token data without clearing the queue."""
     return file_queue.dequeue_without_removal()
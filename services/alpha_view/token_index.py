@@ -0,0 +1,143 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+from utils.file_queue import FileQueue
+
+
+class TokenIndex:
+    """
+    Secondary in-memory indexes over the token entries retained in the queue.
+
+    Entries are indexed by chain (both `chain` and `chainName`, lower-cased) and
+    kept in lists sorted by `fdv` and by `amount`, so a filtered read starts
+    from the smallest matching candidate set instead of every entry. The index
+    catches up with the log lazily on each query, including entries written by
+    other processes, and drops entries once the log start moves past them.
+    """
+
+    def __init__(self, queue: FileQueue):
+        self.queue = queue
+        self.lock = threading.Lock()
+        self.entries: Dict[int, Dict] = {}
+        self.by_chain: Dict[str, List[int]] = {}
+        self.by_fdv: List[Tuple[float, int]] = []
+        self.by_amount: List[Tuple[int, int]] = []
+        self.start_seq = 0
+        self.next_seq = 0
+
+    @staticmethod
+    def _chain_keys(entry: Dict) -> set:
+        keys = {str(entry.get("chain", "")).lower()}
+        if entry.get("chainName"):
+            keys.add(entry["chainName"].lower())
+        return keys
+
+    def _add(self, entry: Dict):
+        seq = entry["seq"]
+        self.entries[seq] = entry
+        for key in self._chain_keys(entry):
+            self.by_chain.setdefault(key, []).append(seq)
+        insort(self.by_fdv, (entry.get("fdv", 0), seq))
+        insort(self.by_amount, (entry.get("amount", 0), seq))
+
+    def _evict_before(self, start_seq: int):
+        """Drops entries below the new log start."""
+        # Entries are inserted in seq order, so the first one is the oldest
+        if not self.entries or next(iter(self.entries)) >= start_seq:
+            return
+        self.entries = {s: e for s, e in self.entries.items() if s >= start_seq}
+        self.by_chain = {
+            key: seqs[bisect_left(seqs, start_seq) :]
+            for key, seqs in self.by_chain.items()
+            if seqs and seqs[-1] >= start_seq
+        }
+        self.by_fdv = [item for item in self.by_fdv if item[1] >= start_seq]
+        self.by_amount = [item for item in self.by_amount if item[1] >= start_seq]
+
+    def refresh(self):
+        """Indexes entries appended since the last query and evicts removed ones."""
+        start_seq, next_seq = self.queue.head()
+        if start_seq > self.start_seq:
+            self._evict_before(start_seq)
+            self.start_seq = start_seq
+        if next_seq > self.next_seq:
+            entries, self.next_seq = self.queue.get_entries_after_offset(
+                max(self.next_seq, start_seq)
+            )
+            for entry in entries:
+                self._add(entry)
+
+    def query(
+        self,
+        chain: Optional[str] = None,
+        min_fdv: Optional[float] = None,
+        max_fdv: Optional[float] = None,
+        min_amount: Optional[int] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Dict], int]:
+        """
+        Returns one page of the entries matching every given filter, in log order.
+
+        Args:
+            chain (str, optional): Chain ID or chain name, case-insensitive
+            min_fdv (float, optional): Minimum fully diluted valuation
+            max_fdv (float, optional): Maximum fully diluted valuation
+            min_amount (int, optional): Minimum number of smart wallets
+            offset (int): Number of matching entries to skip
+            limit (int, optional): Maximum number of entries to return
+
+        Returns:
+            Tuple[List[Dict], int]: The page of entries and the total match count
+        """
+        with self.lock:
+            self.refresh()
+
+            # Start from the most selective index, then check the other filters
+            candidates = []
+            if chain is not None:
+                candidates.append(self.by_chain.get(chain.lower(), []))
+            if min_fdv is not None or max_fdv is not None:
+                low = (
+                    bisect_left(self.by_fdv, (min_fdv, -1))
+                    if min_fdv is not None
+                    else 0
+                )
+                high = (
+                    bisect_right(self.by_fdv, (max_fdv, float("inf")))
+                    if max_fdv is not None
+                    else len(self.by_fdv)
+                )
+                candidates.append([seq for _, seq in self.by_fdv[low:high]])
+            if min_amount is not None:
+                low = bisect_left(self.by_amount, (min_amount, -1))
+                candidates.append([seq for _, seq in self.by_amount[low:]])
+            if candidates:
+                seqs = sorted(min(candidates, key=len))
+            else:
+                seqs = self.entries
+
+            matches = []
+            for seq in seqs:
+                entry = self.entries[seq]
+                if chain is not None and chain.lower() not in self._chain_keys(entry):
+                    continue
+                fdv = entry.get("fdv", 0)
+                if min_fdv is not None and fdv < min_fdv:
+                    continue
+                if max_fdv is not None and fdv > max_fdv:
+                    continue
+                if min_amount is not None and entry.get("amount", 0) < min_amount:
+                    continue
+                matches.append(entry)
+
+        stop = offset + limit if limit is not None else None
+        return matches[offset:stop], len(matches)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "indexed_entries": len(self.entries),
+                "indexed_chains": len(self.by_chain),
+            }
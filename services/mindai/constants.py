@@ -11,3 +11,23 @@ MIND_AI_BASE_URL = os.getenv("MIND_AI_BASE_URL")  # API Configuration
 
 # Allowed periods for the API calls
 ALLOWED_PERIODS = ["day", "week", "twoWeek", "threeWeek", "month"]
+
+# HTTP connection pool for the MindAI API
+MIND_AI_MAX_CONNECTIONS = int(os.getenv("MIND_AI_MAX_CONNECTIONS", 20))
+MIND_AI_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("MIND_AI_MAX_KEEPALIVE_CONNECTIONS", 10)
+)
+MIND_AI_KEEPALIVE_EXPIRY = float(os.getenv("MIND_AI_KEEPALIVE_EXPIRY", 30))
+MIND_AI_REQUEST_TIMEOUT = float(os.getenv("MIND_AI_REQUEST_TIMEOUT", 15))
+MIND_AI_HTTP2 = os.getenv("MIND_AI_HTTP2", "true").lower() == "true"
+
+# Response cache for upstream reads (seconds)
+MIND_AI_CACHE_TTLS = {
+    "get_top_gainers_token": int(os.getenv("MIND_AI_CACHE_TTL_TOP_GAINERS", 60)),
+    "get_top_kols": int(os.getenv("MIND_AI_CACHE_TTL_TOP_KOLS", 120)),
+    "get_top_mentioned_tokens": int(os.getenv("MIND_AI_CACHE_TTL_TOP_MENTIONS", 60)),
+    "get_best_call": int(os.getenv("MIND_AI_CACHE_TTL_BEST_CALL", 120)),
+}
+MIND_AI_CACHE_DEFAULT_TTL = 60
+MIND_AI_CACHE_STALE_TTL = int(os.getenv("MIND_AI_CACHE_STALE_TTL", 300))
+MIND_AI_CACHE_MAX_SIZE = int(os.getenv("MIND_AI_CACHE_MAX_SIZE", 512))
@@ -1,14 +1,137 @@
-import requests
-from typing import Dict, Optional, List
+import importlib.util
+import httpx
+from typing import Any, Dict, Optional, List, Tuple
 from config import MIND_AI_AUTH_KEY
-from services.mindai.constants import MIND_AI_BASE_URL
+from services.mindai.constants import (
+    MIND_AI_BASE_URL,
+    MIND_AI_HTTP2,
+    MIND_AI_KEEPALIVE_EXPIRY,
+    MIND_AI_MAX_CONNECTIONS,
+    MIND_AI_MAX_KEEPALIVE_CONNECTIONS,
+    MIND_AI_REQUEST_TIMEOUT,
+)
 
 
-class MindAIAPIClient:
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 without it."""
+    return MIND_AI_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _pool_options() -> Dict[str, Any]:
+    """
+    Shared connection pool settings for the sync and async clients.
+
+    All requests go to MIND_AI_BASE_URL, so the pool limits are effectively
+    per-host limits for the MindAI API.
+    """
+    return {
+        "base_url": MIND_AI_BASE_URL or "",
+        "headers": {"x-api-key": MIND_AI_AUTH_KEY or ""},
+        "limits": httpx.Limits(
+            max_connections=MIND_AI_MAX_CONNECTIONS,
+            max_keepalive_connections=MIND_AI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=MIND_AI_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(MIND_AI_REQUEST_TIMEOUT),
+        "http2": _http2_available(),
+    }
+
+
+class BaseMindAIAPIClient:
+    """
+    Builds the endpoint and query parameters for every MindAI API call.
+    Transport is left to the sync and async subclasses.
+    """
+
+    @staticmethod
+    def _top_gainers_token_request(
+        period: int,
+        tokensAmount: int,
+        kolsAmount: int,
+        tokenCategory: str,
+        sortBy: str,
+    ) -> Tuple[str, Dict]:
+        params = {
+            "period": period,
+            "tokensAmount": tokensAmount,
+            "kolsAmount": kolsAmount,
+            "tokenCategory": tokenCategory,
+            "sortBy": sortBy,
+        }
+        return "/v1/top-gainers-token", params
+
+    @staticmethod
+    def _top_kols_request(
+        period: int, kolsAmount: int, tokenCategory: Optional[str]
+    ) -> Tuple[str, Dict]:
+        params = {"period": period, "kolsAmount": kolsAmount}
+
+        # Add tokenCategory if provided
+        if tokenCategory:
+            params["tokenCategory"] = tokenCategory
+
+        return "/v1/top-kols", params
+
+    @staticmethod
+    def _top_mentioned_tokens_request(
+        period: int, tokensAmount: int, kols: bool, tokenCategory: Optional[str]
+    ) -> Tuple[str, Dict]:
+        params = {
+            "period": period,
+            "tokensAmount": tokensAmount,
+            "kols": str(kols).lower(),  # Convert to lowercase 'true' or 'false'
+        }
+
+        # Add tokenCategory if provided
+        if tokenCategory:
+            params["tokenCategory"] = tokenCategory
+
+        return "/v1/top-mentioned-tokens", params
+
+    @staticmethod
+    def _best_call_request(
+        period: Optional[str],
+        influencer_twitter_username: Optional[str],
+        coin_symbol: Optional[str],
+        sortBy: Optional[str],
+    ) -> Tuple[str, Dict]:
+        if sortBy is None:
+            sortBy = "RoaAtAth"
+        params = {
+            "sortBy": sortBy,
+            "period": period,
+            "influencerTwitterUserName": influencer_twitter_username,
+            "symbol": coin_symbol,
+        }
+        # Filter out None and empty string values
+        params = {
+            key: value for key, value in params.items() if value not in (None, "")
+        }
+        return "/get-best-call", params
+
+    @staticmethod
+    def _parse_response(response: httpx.Response):
+        if response.status_code == 200:
+            return response.json()
+        else:
+            response.raise_for_status()
+
+
+class AsyncMindAIAPIClient(BaseMindAIAPIClient):
+    """
+    Non-blocking MindAI API client backed by a bounded keep-alive connection pool.
+    Connections are reused across calls; call `aclose()` on shutdown.
+    """
+
     def __init__(self):
-        self.headers = {"x-api-key": MIND_AI_AUTH_KEY}
+        self.http = httpx.AsyncClient(**_pool_options())
 
-    def get_top_gainers_token(
+    async def _get(self, request: Tuple[str, Dict]):
+        endpoint, params = request
+        response = await self.http.get(endpoint, params=params)
+        return self._parse_response(response)
+
+    async def get_top_gainers_token(
         self,
         period: int = 24,
         tokensAmount: int = 5,
@@ -29,23 +152,13 @@ class MindAIAPIClient:
         Returns:
             List[Dict]: List of top gainer tokens
         """
-        endpoint = f"{MIND_AI_BASE_URL}/v1/top-gainers-token"
-        params = {
-            "period": period,
-            "tokensAmount": tokensAmount,
-            "kolsAmount": kolsAmount,
-            "tokenCategory": tokenCategory,
-            "sortBy": sortBy,
-        }
-
-        response = requests.get(endpoint, params=params, headers=self.headers)
+        return await self._get(
+            self._top_gainers_token_request(
+                period, tokensAmount, kolsAmount, tokenCategory, sortBy
+            )
+        )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            response.raise_for_status()
-
-    def get_top_kols(
+    async def get_top_kols(
         self, period: int = 24, kolsAmount: int = 3, tokenCategory: str = None
     ) -> List[Dict]:
         """
@@ -59,21 +172,11 @@ class MindAIAPIClient:
         Returns:
             List[Dict]: List of top performing KOLs
         """
-        endpoint = f"{MIND_AI_BASE_URL}/v1/top-kols"
-        params = {"period": period, "kolsAmount": kolsAmount}
+        return await self._get(
+            self._top_kols_request(period, kolsAmount, tokenCategory)
+        )
 
-        # Add tokenCategory if provided
-        if tokenCategory:
-            params["tokenCategory"] = tokenCategory
-
-        response = requests.get(endpoint, params=params, headers=self.headers)
-
-        if response.status_code == 200:
-            return response.json()
-        else:
-            response.raise_for_status()
-
-    def get_top_mentioned_tokens(
+    async def get_top_mentioned_tokens(
         self,
         period: int = 24,
         tokensAmount: int = 5,
@@ -92,23 +195,79 @@ class MindAIAPIClient:
         Returns:
             List[Dict]: List of mentioned tokens
         """
-        endpoint = f"{MIND_AI_BASE_URL}/v1/top-mentioned-tokens"
-        params = {
-            "period": period,
-            "tokensAmount": tokensAmount,
-            "kols": str(kols).lower(),  # Convert to lowercase 'true' or 'false'
-        }
+        return await self._get(
+            self._top_mentioned_tokens_request(
+                period, tokensAmount, kols, tokenCategory
+            )
+        )
 
-        # Add tokenCategory if provided
-        if tokenCategory:
-            params["tokenCategory"] = tokenCategory
+    async def get_best_call(
+        self,
+        period: Optional[str] = None,
+        influencer_twitter_username: Optional[str] = None,
+        coin_symbol: Optional[str] = None,
+        sortBy: Optional[str] = "RoaAtAth",
+    ) -> Dict:
+        return await self._get(
+            self._best_call_request(
+                period, influencer_twitter_username, coin_symbol, sortBy
+            )
+        )
 
-        response = requests.get(endpoint, params=params, headers=self.headers)
+    async def aclose(self):
+        """Close all pooled connections."""
+        await self.http.aclose()
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            response.raise_for_status()
+
+class MindAIAPIClient(BaseMindAIAPIClient):
+    """
+    Blocking MindAI API client kept for existing callers.
+    Shares request building with AsyncMindAIAPIClient and uses the same pooled,
+    keep-alive transport settings.
+    """
+
+    def __init__(self):
+        self.http = httpx.Client(**_pool_options())
+
+    def _get(self, request: Tuple[str, Dict]):
+        endpoint, params = request
+        response = self.http.get(endpoint, params=params)
+        return self._parse_response(response)
+
+    def get_top_gainers_token(
+        self,
+        period: int = 24,
+        tokensAmount: int = 5,
+        kolsAmount: int = 3,
+        tokenCategory: str = "top100",
+        sortBy: str = "RoaAtAth",
+    ) -> List[Dict]:
+        """Blocking variant of AsyncMindAIAPIClient.get_top_gainers_token."""
+        return self._get(
+            self._top_gainers_token_request(
+                period, tokensAmount, kolsAmount, tokenCategory, sortBy
+            )
+        )
+
+    def get_top_kols(
+        self, period: int = 24, kolsAmount: int = 3, tokenCategory: str = None
+    ) -> List[Dict]:
+        """Blocking variant of AsyncMindAIAPIClient.get_top_kols."""
+        return self._get(self._top_kols_request(period, kolsAmount, tokenCategory))
+
+    def get_top_mentioned_tokens(
+        self,
+        period: int = 24,
+        tokensAmount: int = 5,
+        kols: bool = True,
+        tokenCategory: Optional[str] = None,
+    ) -> List[Dict]:
+        """Blocking variant of AsyncMindAIAPIClient.get_top_mentioned_tokens."""
+        return self._get(
+            self._top_mentioned_tokens_request(
+                period, tokensAmount, kols, tokenCategory
+            )
+        )
 
     def get_best_call(
         self,
@@ -117,23 +276,13 @@ class MindAIAPIClient:
         coin_symbol: Optional[str] = None,
         sortBy: Optional[str] = "RoaAtAth",  # New optional parameter with default
     ) -> Dict:
-        endpoint = f"{MIND_AI_BASE_URL}/get-best-call"
-        if sortBy is None:
-            sortBy = "RoaAtAth"
-        params = {
-            "sortBy": sortBy,
-            "period": period,
-            "influencerTwitterUserName": influencer_twitter_username,
-            "symbol": coin_symbol,
-        }
-        # Filter out None and empty string values
-        params = {
-            key: value for key, value in params.items() if value not in (None, "")
-        }
-
-        response = requests.get(endpoint, params=params, headers=self.headers)
+        """Blocking variant of AsyncMindAIAPIClient.get_best_call."""
+        return self._get(
+            self._best_call_request(
+                period, influencer_twitter_username, coin_symbol, sortBy
+            )
+        )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            response.raise_for_status()
+    def close(self):
+        """Close all pooled connections."""
+        self.http.close()
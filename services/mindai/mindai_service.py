@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import HTTPException
 from schemas.mindai_schemas.best_call_schemas import BestCallData, BestCallResponse
 from schemas.mindai_schemas.mentioned_tokens_schemas import (
@@ -9,11 +10,19 @@ from schemas.mindai_schemas.top_gainers_token_schema import (
     TopGainersTokenResponse,
 )
 from schemas.mindai_schemas.top_kols_schema import TopKolData, TopKolsResponse
-from services.mindai.mindai_client import MindAIAPIClient
+from services.mindai.constants import (
+    MIND_AI_CACHE_DEFAULT_TTL,
+    MIND_AI_CACHE_MAX_SIZE,
+    MIND_AI_CACHE_STALE_TTL,
+    MIND_AI_CACHE_TTLS,
+)
+from services.mindai.mindai_client import AsyncMindAIAPIClient
 from services.mindai.formatting.message_formatter import MessageFormatter
 from typing import List, Optional, get_args, Type, Callable, Dict, Any
 from pydantic import BaseModel
 from utils.period_formatter import PeriodConverter
+from utils.single_flight import SingleFlight
+from utils.ttl_cache import FRESH, STALE, TTLCache
 
 
 class MindAIService:
@@ -22,9 +31,90 @@ class MindAIService:
     """
 
     def __init__(self):
-        self.client = MindAIAPIClient()
+        self.client = AsyncMindAIAPIClient()
+        self.cache = TTLCache(
+            max_size=MIND_AI_CACHE_MAX_SIZE, stale_ttl=MIND_AI_CACHE_STALE_TTL
+        )
+        self.single_flight = SingleFlight()
+        self._refresh_tasks = set()
+
+    async def aclose(self):
+        """Cancel pending cache refreshes and release the pooled upstream connections."""
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        await self.client.aclose()
+
+    @staticmethod
+    def _cache_key(fetch_method: str, params: Dict[str, Any]):
+        """
+        Builds a cache key from the client method and its parameters.
+        Unset parameters are dropped and values are stringified so equivalent
+        calls (e.g. positional vs keyword, True vs "true") share one entry.
+        """
+        normalized = tuple(
+            sorted(
+                (key, str(value).lower() if isinstance(value, bool) else str(value))
+                for key, value in params.items()
+                if value not in (None, "")
+            )
+        )
+        return fetch_method, normalized
+
+    async def _fetch(self, fetch_method: str, **params):
+        """
+        Calls a client method through the response cache.
+
+        Fresh entries are returned directly. Stale entries are returned while a
+        background refresh fetches a new copy. Misses go to the upstream API.
+        """
+        key = self._cache_key(fetch_method, params)
+        state, data = self.cache.get(key)
+        if state == FRESH:
+            return data
+        if state == STALE:
+            self._schedule_refresh(key, fetch_method, params)
+            return data
+
+        return await self._fetch_upstream(key, fetch_method, params)
+
+    async def _fetch_upstream(self, key, fetch_method: str, params: Dict[str, Any]):
+        """
+        Calls the client and caches the result. Identical concurrent calls share
+        a single in-flight upstream request and all receive its result or error.
+        """
+
+        async def call():
+            data = await getattr(self.client, fetch_method)(**params)
+            self._store(key, fetch_method, data)
+            return data
 
-    def fetch_and_format(
+        return await self.single_flight.do(key, call)
+
+    def _store(self, key, fetch_method: str, data):
+        # Empty responses are surfaced as errors, so don't pin them in the cache
+        if data:
+            ttl = MIND_AI_CACHE_TTLS.get(fetch_method, MIND_AI_CACHE_DEFAULT_TTL)
+            self.cache.set(key, data, ttl)
+
+    def _schedule_refresh(self, key, fetch_method: str, params: Dict[str, Any]):
+        if self.single_flight.in_flight(key):
+            return
+        task = asyncio.create_task(self._refresh(key, fetch_method, params))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(self, key, fetch_method: str, params: Dict[str, Any]):
+        try:
+            await self._fetch_upstream(key, fetch_method, params)
+        except Exception:
+            # Keep serving the stale copy; the next lookup will retry
+            pass
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters of the response cache and coalescing counters."""
+        return {**self.cache.stats(), "single_flight": self.single_flight.stats()}
+
+    async def fetch_and_format(
         self,
         fetch_method: str,
         output_schema: Type[BaseModel],
@@ -43,14 +133,8 @@ class MindAIService:
             params (dict, optional): Dictionary of parameters to pass to the fetch method
         """
         try:
-            # Get the method from the client
-            fetch_func = getattr(self.client, fetch_method)
-
-            # Call the function with parameters if provided
-            if params:
-                data = fetch_func(**params)
-            else:
-                data = fetch_func()
+            # Call the client method through the cache with parameters if provided
+            data = await self._fetch(fetch_method, **(params or {}))
 
             if not data:
                 raise HTTPException(
@@ -124,7 +208,7 @@ class MindAIService:
 
         raise TypeError(f"Unexpected data format: {type(data)} in API response.")
 
-    def fetch_best_call(
+    async def fetch_best_call(
         self,
         period: Optional[str] = None,
         influencer_twitter_username: Optional[str] = None,
@@ -135,7 +219,8 @@ class MindAIService:
         Legacy method for fetching best calls. Consider migrating to fetch_and_format.
         """
         try:
-            data = self.client.get_best_call(
+            data = await self._fetch(
+                "get_best_call",
                 period=period,
                 influencer_twitter_username=influencer_twitter_username,
                 coin_symbol=coin_symbol,
@@ -165,7 +250,7 @@ class MindAIService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"External API error: {str(e)}")
 
-    def get_top_gainers_token(
+    async def get_top_gainers_token(
         self,
         period: int = 24,
         tokensAmount: int = 5,
@@ -188,8 +273,13 @@ class MindAIService:
         """
         try:
             # Get raw data from the API
-            data = self.client.get_top_gainers_token(
-                period, tokensAmount, kolsAmount, tokenCategory, sortBy
+            data = await self._fetch(
+                "get_top_gainers_token",
+                period=period,
+                tokensAmount=tokensAmount,
+                kolsAmount=kolsAmount,
+                tokenCategory=tokenCategory,
+                sortBy=sortBy,
             )
 
             if not data:
@@ -223,7 +313,7 @@ class MindAIService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"External API error: {str(e)}")
 
-    def get_top_kols(
+    async def get_top_kols(
         self, period: int = 24, kolsAmount: int = 3, tokenCategory: str = None
     ) -> TopKolsResponse:
         """
@@ -239,7 +329,12 @@ class MindAIService:
         """
         try:
             # Get raw data from the API
-            data = self.client.get_top_kols(period, kolsAmount, tokenCategory)
+            data = await self._fetch(
+                "get_top_kols",
+                period=period,
+                kolsAmount=kolsAmount,
+                tokenCategory=tokenCategory,
+            )
 
             if not data:
                 raise HTTPException(
@@ -263,7 +358,7 @@ class MindAIService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"External API error: {str(e)}")
 
-    def get_top_mentioned_tokens(
+    async def get_top_mentioned_tokens(
         self,
         period: int = 24,
         tokensAmount: int = 5,
@@ -284,8 +379,12 @@ class MindAIService:
         """
         try:
             # Get raw data from the API
-            data = self.client.get_top_mentioned_tokens(
-                period, tokensAmount, kols, tokenCategory
+            data = await self._fetch(
+                "get_top_mentioned_tokens",
+                period=period,
+                tokensAmount=tokensAmount,
+                kols=kols,
+                tokenCategory=tokenCategory,
             )
 
             if not data:
@@ -18,7 +18,7 @@ class MindAIQueryEngine:
 
     def __init__(self):
         self.service = MindAIService()
-        self.logger = Logger(__name__).get_logger()
+        self.logger = logger
 
         # Register standard query handlers
         self.standard_query_mapping = {
@@ -45,6 +45,9 @@ class MindAIQueryEngine:
             question = params.get("question", "").lower()
             return f"🤔 {question}... Really? Ask me something smarter!"
 
+        if query_type == "greeting":
+            return self.platform_responses["general"]
+
         if query_type == "platform_info":
             response_type = params.get("type", "general")
             return self.platform_responses.get(
@@ -53,7 +56,7 @@ class MindAIQueryEngine:
 
         return None
 
-    def process_top_gainers(self, params: dict) -> str:
+    async def process_top_gainers(self, params: dict) -> str:
         """Process top gainers query with new parameter format."""
         # Extract period and convert to hours
         period_value = PeriodConverter.extract_period_from_params(params)
@@ -67,7 +70,7 @@ class MindAIQueryEngine:
         sort_by = params.get("sortBy", "RoaAtAth")
 
         # Call the top_gainers_token method directly
-        response = self.service.get_top_gainers_token(
+        response = await self.service.get_top_gainers_token(
             period=period_hours,
             tokensAmount=tokens_amount,
             kolsAmount=kols_amount,
@@ -76,7 +79,7 @@ class MindAIQueryEngine:
         )
         return response.message
 
-    def process_top_kols(self, params: dict) -> str:
+    async def process_top_kols(self, params: dict) -> str:
         """Process top KOLs query with new parameter format."""
         # Extract period and convert to hours
         period_value = PeriodConverter.extract_period_from_params(params)
@@ -88,12 +91,12 @@ class MindAIQueryEngine:
         kols_amount = params.get("kolsAmount", 3)
 
         # Call the get_top_kols method directly
-        response = self.service.get_top_kols(
+        response = await self.service.get_top_kols(
             period=period_hours, kolsAmount=kols_amount, tokenCategory=token_category
         )
         return response.message
 
-    def process_top_mentions(self, params: dict) -> str:
+    async def process_top_mentions(self, params: dict) -> str:
         """Process top mentioned tokens query with new parameter format."""
         # Extract period and convert to hours
         period_value = PeriodConverter.extract_period_from_params(params)
@@ -106,7 +109,7 @@ class MindAIQueryEngine:
         token_category = params.get("tokenCategory", None)
 
         # Call the get_top_mentioned_tokens method directly
-        response = self.service.get_top_mentioned_tokens(
+        response = await self.service.get_top_mentioned_tokens(
             period=period_hours,
             tokensAmount=tokens_amount,
             kols=kols,
@@ -114,14 +117,16 @@ class MindAIQueryEngine:
         )
         return response.message
 
-    def process_standard_query(self, query_type: str, params: dict) -> Optional[str]:
+    async def process_standard_query(
+        self, query_type: str, params: dict
+    ) -> Optional[str]:
         """Process standard queries using fetch_and_format."""
         if query_type not in self.standard_query_mapping:
             return None
 
         # Special handling for top_mentions
         if query_type == "top_mentions":
-            return self.process_top_mentions(params)
+            return await self.process_top_mentions(params)
 
         fetch_method, output_schema, formatter = self.standard_query_mapping[query_type]
         period_value = PeriodConverter.extract_period_from_params(params)
@@ -130,19 +135,19 @@ class MindAIQueryEngine:
         def adapted_formatter(data):
             return formatter(period_value, data)
 
-        response = self.service.fetch_and_format(
+        response = await self.service.fetch_and_format(
             fetch_method, output_schema, adapted_formatter, {"period": period_value}
         )
         return response.message
 
-    def process_best_call(self, params: dict) -> str:
+    async def process_best_call(self, params: dict) -> str:
         """Process best call query."""
         period_value = PeriodConverter.extract_period_from_params(params)
         influencer = params.get("influencerTwitterUserName", None)
         coin_symbol = params.get("coinSymbol", None)
         sort_by = params.get("sortBy", None)
 
-        response = self.service.fetch_best_call(
+        response = await self.service.fetch_best_call(
             period=period_value,
             influencer_twitter_username=influencer,
             coin_symbol=coin_symbol,
@@ -155,7 +160,7 @@ class MindAIQueryEngine:
         Process queries by routing to appropriate handler methods.
 
         Supported query types:
-        - "stupid_question" and "platform_info" return fixed responses
+        - "stupid_question", "platform_info" and "greeting" return fixed responses
         - "top_gainers" is handled by specialized processing
         - "top_kols" is handled by specialized processing
         - "top_mentions" is handled via specialized processing
@@ -169,24 +174,24 @@ class MindAIQueryEngine:
 
             # Handle top_gainers specially
             if query_type == "top_gainers":
-                return self.process_top_gainers(params)
+                return await self.process_top_gainers(params)
 
             # Handle top_kols specially
             if query_type == "top_kols":
-                return self.process_top_kols(params)
+                return await self.process_top_kols(params)
 
             # Handle top_mentions specially
             if query_type == "top_mentions":
-                return self.process_top_mentions(params)
+                return await self.process_top_mentions(params)
 
             # Try standard queries
-            standard_response = self.process_standard_query(query_type, params)
+            standard_response = await self.process_standard_query(query_type, params)
             if standard_response:
                 return standard_response
 
             # Handle best_call query
             if query_type == "best_call":
-                return self.process_best_call(params)
+                return await self.process_best_call(params)
 
             # If query type is not recognized, raise an exception
             raise ValueError(f"Query type '{query_type}' not recognized.")
@@ -196,20 +201,6 @@ class MindAIQueryEngine:
             # Raise a new exception that can be caught by the caller
             raise Exception("An error occurred while processing your request.") from e
 
-    @staticmethod
-    async def legacy_process_query(query_type: str, params: dict) -> str:
-        """
-        Legacy method for backward compatibility.
-
-        This static method ensures that existing code that calls process_query
-        will continue to work without modification.
-        """
-        engine = MindAIQueryEngine()
-        return await engine.process_query(query_type, params)
-
-
-# Initialize a singleton instance for use in router
-query_engine = MindAIQueryEngine()
-
-# For backward compatibility
-process_query = MindAIQueryEngine.legacy_process_query
+    async def aclose(self):
+        """Release the service's upstream connections and background tasks."""
+        await self.service.aclose()
@@ -0,0 +1,98 @@
+import logging
+from typing import Any, Dict
+
+from services.mindai.query_processor import MindAIQueryEngine
+from services.query_service.constants import (
+    ANSWER_CACHE_MAX_SIZE,
+    ANSWER_CACHE_STATIC_INTENTS,
+    ANSWER_CACHE_STATIC_TTL,
+    ANSWER_CACHE_TTL,
+)
+from services.query_service.query_cache import normalize_query
+from services.query_service.query_processor import QueryProcessor
+from utils.single_flight import SingleFlight
+from utils.ttl_cache import FRESH, TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class UnanswerableQueryError(ValueError):
+    """Raised when a query cannot be classified into a supported intent."""
+
+
+class AnswerPipeline:
+    """
+    Answers a natural-language query in one step: classifies it with the
+    QueryProcessor, then builds the message with the MindAI query engine.
+
+    Finished answers are cached on the normalized query. Answers built from
+    live MindAI data are kept for ANSWER_CACHE_TTL seconds. Fixed responses
+    (e.g. platform_info) are kept for ANSWER_CACHE_STATIC_TTL. Answers built
+    on a fallback classification (the LLM timed out) are not cached. Concurrent
+    identical queries share one pipeline run.
+    """
+
+    def __init__(
+        self, query_processor: QueryProcessor, query_engine: MindAIQueryEngine
+    ):
+        self.query_processor = query_processor
+        self.query_engine = query_engine
+        self.cache = TTLCache(max_size=ANSWER_CACHE_MAX_SIZE)
+        self.single_flight = SingleFlight()
+
+    async def answer(self, query: str, priority: int = 0) -> Dict[str, Any]:
+        """
+        Answers a query, from the cache when the same question was answered recently.
+
+        Args:
+            query (str): Raw user query
+            priority (int): Scheduling priority of the LLM call if one is needed
+
+        Returns:
+            Dict[str, Any]: intent, params, message, whether it was cached and
+            whether the intent is a fallback
+
+        Raises:
+            UnanswerableQueryError: If the query could not be classified
+        """
+        key = normalize_query(query)
+        if not key:
+            raise UnanswerableQueryError("Query could not be processed")
+
+        state, answer = self.cache.get(key)
+        if state == FRESH:
+            return {**answer, "cached": True}
+
+        async def run() -> Dict[str, Any]:
+            answer = await self._run(query, priority)
+            if answer["fallback"]:
+                return answer
+            ttl = (
+                ANSWER_CACHE_STATIC_TTL
+                if answer["intent"] in ANSWER_CACHE_STATIC_INTENTS
+                else ANSWER_CACHE_TTL
+            )
+            self.cache.set(key, answer, ttl)
+            return answer
+
+        answer = await self.single_flight.do(key, run)
+        return {**answer, "cached": False}
+
+    async def _run(self, query: str, priority: int) -> Dict[str, Any]:
+        intent, params, source = await self.query_processor.process_query_with_source(
+            query, priority
+        )
+        if not intent:
+            raise UnanswerableQueryError("Query could not be processed")
+
+        message = await self.query_engine.process_query(intent, params)
+        return {
+            "intent": intent,
+            "params": params,
+            "message": message,
+            "fallback": source == "fallback",
+        }
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Returns the answer cache counters and coalescing counters."""
+        return {**self.cache.stats(), "single_flight": self.single_flight.stats()}
@@ -11,8 +11,58 @@ API_KEY = os.getenv("OPEN_AI_KEY")
 LLM_TEMPERATURE = 0.2
 LLM_MODEL_NAME = "gpt-4o"
 
-# Cache file path
-QUERY_CACHE_FILE = "query_cache.json"
+# Cache journal path, shared by all workers; entries are appended and compacted
+# in the background under a lock on <path>.lock
+QUERY_CACHE_FILE = "query_cache.jsonl"
+# Cache file written before the journal, imported once if the journal is empty
+QUERY_CACHE_LEGACY_FILE = "query_cache.json"
+QUERY_CACHE_COMPACT_MIN_RECORDS = int(
+    os.getenv("QUERY_CACHE_COMPACT_MIN_RECORDS", 1000)
+)
+
+# Classification cache bounds: entries kept and their lifetime (seconds)
+QUERY_CACHE_MAX_SIZE = int(os.getenv("QUERY_CACHE_MAX_SIZE", 5000))
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", 24 * 60 * 60))
+
+# Resolve high-confidence queries with local rules before calling the LLM
+QUERY_LOCAL_CLASSIFIER = os.getenv("QUERY_LOCAL_CLASSIFIER", "true").lower() == "true"
+
+# Reuse the classification of a similar earlier query (cosine similarity of
+# hashed character n-grams); see tests/semantic_cache_benchmark.py for tuning
+QUERY_SEMANTIC_CACHE = os.getenv("QUERY_SEMANTIC_CACHE", "true").lower() == "true"
+QUERY_SEMANTIC_THRESHOLD = float(os.getenv("QUERY_SEMANTIC_THRESHOLD", 0.75))
+QUERY_SEMANTIC_DIM = int(os.getenv("QUERY_SEMANTIC_DIM", 1024))
+
+# Micro-batching of LLM classifications: queries reaching the LLM within
+# QUERY_BATCH_MAX_WAIT_MS of each other are classified in one multi-query
+# completion of up to QUERY_BATCH_MAX_SIZE queries (1 disables batching). If a
+# batch answer is unusable, its queries are classified one by one
+QUERY_BATCH_MAX_SIZE = int(os.getenv("QUERY_BATCH_MAX_SIZE", 16))
+QUERY_BATCH_MAX_WAIT_MS = int(os.getenv("QUERY_BATCH_MAX_WAIT_MS", 20))
+
+# LLM call scheduling: at most QUERY_LLM_MAX_CONCURRENCY calls in flight and
+# QUERY_LLM_MAX_QUEUE waiting, lower priority values first. A call not finished
+# QUERY_LLM_TIMEOUT seconds after it was queued is cancelled
+QUERY_LLM_MAX_CONCURRENCY = int(os.getenv("QUERY_LLM_MAX_CONCURRENCY", 8))
+QUERY_LLM_MAX_QUEUE = int(os.getenv("QUERY_LLM_MAX_QUEUE", 200))
+QUERY_LLM_TIMEOUT = float(os.getenv("QUERY_LLM_TIMEOUT", 10))
+
+# Answer for queries whose LLM call timed out or was rejected: the closest
+# earlier answer above QUERY_FALLBACK_SEMANTIC_THRESHOLD, else
+# QUERY_FALLBACK_RESULT (the engine's general platform reply)
+QUERY_LLM_FALLBACK = os.getenv("QUERY_LLM_FALLBACK", "true").lower() == "true"
+QUERY_FALLBACK_SEMANTIC_THRESHOLD = float(
+    os.getenv("QUERY_FALLBACK_SEMANTIC_THRESHOLD", 0.5)
+)
+QUERY_FALLBACK_RESULT = ("platform_info", {"type": "general"})
+
+# Finished answers of /query/answer, keyed on the normalized query (seconds).
+# Answers built from MindAI data follow its shortest response cache TTL;
+# fixed responses don't depend on data and are kept longer.
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", 60))
+ANSWER_CACHE_STATIC_TTL = int(os.getenv("ANSWER_CACHE_STATIC_TTL", 60 * 60))
+ANSWER_CACHE_STATIC_INTENTS = ("stupid_question", "platform_info", "greeting")
+ANSWER_CACHE_MAX_SIZE = int(os.getenv("ANSWER_CACHE_MAX_SIZE", 1000))
 
 # Common phrases mappings (✅ Taken from original file)
 COMMON_PHRASES = {
@@ -0,0 +1,181 @@
+import re
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from services.query_service.query_cache import normalize_query
+
+# Periods in ascending order with their length in days
+PERIOD_DAYS = [
+    ("day", 1),
+    ("week", 7),
+    ("twoWeek", 14),
+    ("threeWeek", 21),
+    ("month", 30),
+]
+DEFAULT_PERIOD = "week"
+
+# Periods each intent accepts (top_kols has no threeWeek)
+INTENT_PERIODS = {
+    "top_gainers": ("day", "week", "twoWeek", "threeWeek", "month"),
+    "top_mentions": ("day", "week", "twoWeek", "threeWeek", "month"),
+    "best_call": ("day", "week", "twoWeek", "threeWeek", "month"),
+    "top_kols": ("day", "week", "twoWeek", "month"),
+}
+
+# Phrases for each intent, following the example mappings in QUERY_SYSTEM_TEMPLATE.
+# Matched on the normalized query; "call" vs "calls" separates best_call from
+# top_gainers, as in the template rules.
+INTENT_PATTERNS = [
+    (
+        "best_call",
+        re.compile(r"\b(?:best|top|greatest|biggest) (?:single )?(?:call|mention)\b"),
+    ),
+    (
+        "top_mentions",
+        re.compile(
+            r"\b(?:most|top) (?:mentioned|talked about|discussed)\b"
+            r"|\bmentioned (?:the )?most\b|\btrending\b"
+            r"|\b(?:top|most) mentions\b"
+        ),
+    ),
+    (
+        "top_gainers",
+        re.compile(
+            r"\b(?:top |biggest |best )?gainers?\b"
+            r"|\b(?:best|top) calls\b"
+            r"|\b(?:best|top) performing (?:tokens?|coins?)\b"
+            r"|\b(?:best|top) performers\b"
+        ),
+    ),
+    (
+        "top_kols",
+        re.compile(r"\b(?:(?:best|top) (?:performing )?)?(?:kols?|influencers?)\b"),
+    ),
+]
+
+# Explicit periods ("today", "this week", "last month")
+PERIOD_WORDS = [
+    (re.compile(r"\b(?:today|daily|yesterday|24h|tonight)\b"), "day"),
+    (re.compile(r"\b(?:weekly|7d)\b"), "week"),
+    (re.compile(r"\bfortnight\b"), "twoWeek"),
+    (re.compile(r"\b(?:monthly|30d)\b"), "month"),
+    (re.compile(r"\b(?:this|last|past|the) (day|week|month)\b"), None),
+]
+
+# Durations ("10 days", "2 weeks", "1h"), rounded up to the next period
+DURATION = re.compile(
+    r"\b(\d+(?:\.\d+)?) ?(minutes?|mins?|hours?|hrs?|h|days?|d|weeks?|w|months?)\b"
+)
+UNIT_DAYS = {"m": 1 / 1440, "h": 1 / 24, "d": 1, "w": 7}
+
+HANDLE = re.compile(r"@(\w+)")
+CASHTAG = re.compile(r"\$([A-Za-z][A-Za-z0-9]*)")
+
+# Words that carry no intent or parameter. Any other word left after the intent
+# and period phrases are removed makes the match low-confidence, including
+# unsupported periods such as "all time".
+FILLER_WORDS = set("""
+    a an the this that these those last past over in on of for from by to at with
+    and or me us i we you my our your show give list tell find get see know let
+    please can could would will what whats which who whos are is were was be been
+    did do does has have how now right current currently so far recent recently
+    top best most token tokens coin coins crypto cryptos call calls mention
+    mentions performing performance performers market markets period
+    ones one any some there their s
+    """.split())
+
+
+def _period_for_days(days: float) -> str:
+    for period, period_days in PERIOD_DAYS:
+        if days <= period_days:
+            return period
+    return PERIOD_DAYS[-1][0]
+
+
+def extract_period(text: str) -> Tuple[Optional[str], str]:
+    """
+    Finds the period of a normalized query.
+
+    Returns:
+        Tuple[Optional[str], str]: The period (None if not stated) and the text
+        with the period phrase removed
+    """
+    match = DURATION.search(text)
+    if match:
+        amount = float(match.group(1))
+        unit = match.group(2)
+        days = amount * (30 if unit.startswith("month") else UNIT_DAYS[unit[0]])
+        return _period_for_days(days), text[: match.start()] + text[match.end() :]
+
+    for pattern, period in PERIOD_WORDS:
+        match = pattern.search(text)
+        if match:
+            period = period or match.group(1)
+            return period, text[: match.start()] + text[match.end() :]
+
+    return None, text
+
+
+def content_words(text: str) -> Tuple[Optional[str], FrozenSet[str]]:
+    """
+    Splits a normalized query into its period and the words that are neither
+    intent phrases, period phrases nor filler, such as coin or influencer names.
+
+    Returns:
+        Tuple[Optional[str], FrozenSet[str]]: The period (None if not stated)
+        and the remaining content words
+    """
+    for _, pattern in INTENT_PATTERNS:
+        text = pattern.sub(" ", text)
+    period, text = extract_period(text)
+    return period, frozenset(word for word in text.split() if word not in FILLER_WORDS)
+
+
+def classify_locally(question: str) -> Optional[Tuple[str, Dict]]:
+    """
+    Classifies a query with deterministic rules, without calling the LLM.
+
+    A result is returned only when exactly one intent phrase matches and every
+    remaining word is filler, so anything unusual (names, coins, off-topic
+    questions) is left to the LLM.
+
+    Args:
+        question (str): Raw user query
+
+    Returns:
+        Optional[Tuple[str, Dict]]: (intent, params), or None if not confident
+    """
+    handles = HANDLE.findall(question)
+    cashtags = CASHTAG.findall(question)
+    text = normalize_query(CASHTAG.sub(" ", HANDLE.sub(" ", question)))
+
+    intents = {intent for intent, pattern in INTENT_PATTERNS if pattern.search(text)}
+
+    # A single call or mention of an influencer is best_call, and plural calls
+    # by influencers are top_gainers, so those phrases win over the KOL words
+    if len(intents) > 1:
+        intents.discard("top_kols")
+    if len(intents) != 1:
+        return None
+
+    intent = intents.pop()
+    period, words = content_words(text)
+    if words:
+        return None
+
+    if (handles or cashtags) and intent != "best_call":
+        return None  # A specific influencer or coin needs the LLM's judgement
+
+    period = period or DEFAULT_PERIOD
+    if period not in INTENT_PERIODS[intent]:
+        # Round up to the next period the intent supports
+        days = dict(PERIOD_DAYS)[period]
+        period = next(
+            p for p, d in PERIOD_DAYS if p in INTENT_PERIODS[intent] and d >= days
+        )
+
+    params: Dict = {"period": period}
+    if cashtags:
+        params["coinSymbol"] = cashtags[0].lower()
+    if handles:
+        params["influencerTwitterUserName"] = handles[0].lower()
+    return intent, params
@@ -0,0 +1,169 @@
+import json
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from utils.cache_journal import CacheJournal
+from utils.ttl_cache import FRESH, TTLCache
+
+# Spelled-out numbers canonicalized to digits ("ten days" == "10 days")
+NUMBER_WORDS = {
+    "one": "1",
+    "two": "2",
+    "three": "3",
+    "four": "4",
+    "five": "5",
+    "six": "6",
+    "seven": "7",
+    "eight": "8",
+    "nine": "9",
+    "ten": "10",
+    "eleven": "11",
+    "twelve": "12",
+    "fourteen": "14",
+    "fifteen": "15",
+    "twenty": "20",
+    "thirty": "30",
+}
+
+_APOSTROPHES = re.compile(r"['’`]")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+# Everything but word characters and whitespace, keeping decimal points
+_PUNCTUATION = re.compile(r"(?!(?<=\d)\.(?=\d))[^\w\s]")
+
+
+def _canonical_number(match: re.Match) -> str:
+    number = float(match.group())
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+def normalize_query(question: str) -> str:
+    """
+    Normalizes a query into its cache key.
+
+    Lower-cases, drops apostrophes, turns punctuation (including '@' and '$'
+    prefixes and hyphens) into spaces, canonicalizes numbers ("07", "7.0" and
+    "seven" all become "7") and collapses whitespace, so trivially different
+    phrasings of the same question share one entry.
+
+    Args:
+        question (str): Raw user query
+
+    Returns:
+        str: The normalized cache key
+    """
+    text = _APOSTROPHES.sub("", question.lower())
+    text = _PUNCTUATION.sub(" ", text)
+    text = _NUMBER.sub(_canonical_number, text)
+    return " ".join(NUMBER_WORDS.get(word, word) for word in text.split())
+
+
+class QueryCache:
+    """
+    LRU cache of query classifications keyed on the normalized query.
+
+    Entries expire after `ttl` seconds and the least recently used entry is
+    evicted once `max_size` is reached.
+
+    With a `journal`, saved entries are loaded on first use and `persist`
+    appends only the new entry. Once the journal holds at least
+    `compact_min_records` records and more than twice the live entries,
+    `needs_compaction` tells the owner to run `compact` in the background.
+    Worker processes may share the journal. A pre-journal JSON cache at
+    `legacy_path` is imported when the journal is empty.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: Optional[float],
+        journal: Optional[CacheJournal] = None,
+        compact_min_records: int = 1000,
+        legacy_path: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.cache = TTLCache(max_size=max_size)
+        self.journal = journal
+        self.compact_min_records = compact_min_records
+        self.legacy_path = legacy_path
+        self._loaded = journal is None
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self):
+        """Loads the journal unless already loaded. Blocking; run it off the event loop."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            entries = self.journal.load()
+            for key, ((intent, params), ttl) in entries.items():
+                self.cache.set(normalize_query(key), (intent, params), ttl)
+            if not entries and self.legacy_path:
+                self._import_legacy()
+            self._loaded = True
+
+    def _import_legacy(self):
+        try:
+            with open(self.legacy_path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for question, (intent, params) in entries.items():
+            self.cache.set(normalize_query(question), (intent, params), self.ttl)
+        self.compact()
+
+    def get(self, question: str) -> Optional[Tuple[str, dict]]:
+        self.load()
+        state, result = self.cache.get(normalize_query(question))
+        if state != FRESH:
+            return None
+        intent, params = result
+        return intent, dict(params)
+
+    def set(self, question: str, result: Tuple[str, dict]):
+        self.load()
+        intent, params = result
+        self.cache.set(normalize_query(question), (intent, dict(params)), self.ttl)
+
+    def persist(self, question: str, result: Tuple[str, dict]):
+        """Appends one entry to the journal. Blocking; call it off the event loop."""
+        if self.journal is not None:
+            intent, params = result
+            self.journal.append(normalize_query(question), [intent, params], self.ttl)
+
+    def needs_compaction(self) -> bool:
+        if self.journal is None:
+            return False
+        records = self.journal.records
+        # Other workers' entries survive compaction, so compare with those too
+        live = max(len(self.cache), self.journal.live)
+        return records >= self.compact_min_records and records > 2 * live
+
+    def compact(self):
+        """
+        Rewrites the journal with only the live entries of every worker, up to
+        the cache size. Blocking.
+        """
+        if self.journal is not None:
+            self.journal.compact(
+                lambda: [
+                    (key, list(result), ttl) for key, result, ttl in self.cache.items()
+                ],
+                max_entries=self.cache.max_size,
+            )
+
+    def close(self):
+        """Closes the journal's file descriptors. Blocking."""
+        if self.journal is not None:
+            self.journal.close()
+
+    def stats(self) -> Dict:
+        stats = self.cache.stats()
+        if self.journal is not None:
+            stats["journal_records"] = self.journal.records
+        return stats
@@ -1,121 +1,426 @@
-import json
+import asyncio
 import logging
-from typing import Optional, Tuple
+import time
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-import aiofiles
-from langchain_core.prompts import (
-    SystemMessagePromptTemplate,
-    HumanMessagePromptTemplate,
-    ChatPromptTemplate,
-)
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_openai import ChatOpenAI
-from langchain_community.cache import InMemoryCache
-from langchain.globals import set_llm_cache
-
-from schemas.query_service_schemas.query_schemas import QueryIntent
+from schemas.query_service_schemas.query_schemas import QueryIntent, QueryIntentBatch
 from services.query_service.constants import (
     API_KEY,
     COMMON_PHRASES,
     LLM_MODEL_NAME,
     LLM_TEMPERATURE,
+    QUERY_BATCH_MAX_SIZE,
+    QUERY_BATCH_MAX_WAIT_MS,
+    QUERY_CACHE_COMPACT_MIN_RECORDS,
     QUERY_CACHE_FILE,
+    QUERY_CACHE_LEGACY_FILE,
+    QUERY_CACHE_MAX_SIZE,
+    QUERY_CACHE_TTL,
+    QUERY_FALLBACK_RESULT,
+    QUERY_FALLBACK_SEMANTIC_THRESHOLD,
+    QUERY_LLM_FALLBACK,
+    QUERY_LLM_MAX_CONCURRENCY,
+    QUERY_LLM_MAX_QUEUE,
+    QUERY_LLM_TIMEOUT,
+    QUERY_LOCAL_CLASSIFIER,
+    QUERY_SEMANTIC_CACHE,
+    QUERY_SEMANTIC_DIM,
+    QUERY_SEMANTIC_THRESHOLD,
+)
+from services.query_service.intent_rules import classify_locally
+from services.query_service.query_cache import QueryCache, normalize_query
+from services.query_service.semantic_cache import SemanticCache
+from utils.cache_journal import CacheJournal
+from utils.micro_batcher import MicroBatcher
+from utils.priority_scheduler import PriorityScheduler, SchedulerOverloaded
+from utils.single_flight import SingleFlight
+from services.query_service.template_constants import (
+    QUERY_BATCH_HUMAN_TEMPLATE,
+    QUERY_SYSTEM_TEMPLATE,
 )
-from services.query_service.template_constants import QUERY_SYSTEM_TEMPLATE
 
-# Initialize cache
-set_llm_cache(InMemoryCache())
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# LangChain's process-wide LLM response cache, installed with the first chain
+_llm_cache_installed = False
+
+
+def _install_llm_cache():
+    global _llm_cache_installed
+    if not _llm_cache_installed:
+        from langchain.globals import set_llm_cache
+        from langchain_community.cache import InMemoryCache
+
+        set_llm_cache(InMemoryCache())
+        _llm_cache_installed = True
+
 
 class QueryProcessor:
-    def __init__(self):
-        # Initialize LangChain components
-        self.llm = ChatOpenAI(
-            temperature=LLM_TEMPERATURE, model_name=LLM_MODEL_NAME, api_key=API_KEY
+    def __init__(
+        self,
+        chain: Optional["Runnable"] = None,
+        batch_chain: Optional["Runnable"] = None,
+    ):
+        """
+        Args:
+            chain (Runnable, optional): Classification chain taking {"input": query}
+                and returning a QueryIntent; defaults to the GPT-4o chain
+            batch_chain (Runnable, optional): Chain taking {"queries": numbered
+                list} and returning a QueryIntentBatch; defaults to the GPT-4o
+                multi-query chain when `chain` is not given. Pass fakes for both
+                to run without the OpenAI API.
+
+        The default chains, and the LangChain and OpenAI imports behind them,
+        are built on the first query that needs the LLM, so creating the
+        processor at startup is cheap.
+        """
+        # Query cache, bounded by size and age and persisted to an append-only
+        # journal that is loaded on first use
+        self.query_cache = QueryCache(
+            max_size=QUERY_CACHE_MAX_SIZE,
+            ttl=QUERY_CACHE_TTL,
+            journal=CacheJournal(QUERY_CACHE_FILE),
+            compact_min_records=QUERY_CACHE_COMPACT_MIN_RECORDS,
+            legacy_path=QUERY_CACHE_LEGACY_FILE,
+        )
+        self._compaction: Optional[asyncio.Task] = None
+
+        # Similarity cache for paraphrases that miss the exact-match cache
+        self.semantic_cache = (
+            SemanticCache(
+                threshold=QUERY_SEMANTIC_THRESHOLD,
+                max_size=QUERY_CACHE_MAX_SIZE,
+                ttl=QUERY_CACHE_TTL,
+                dim=QUERY_SEMANTIC_DIM,
+            )
+            if QUERY_SEMANTIC_CACHE
+            else None
         )
 
-        self.parser = PydanticOutputParser(pydantic_object=QueryIntent)
+        # Counters for the share of queries answered without an LLM call
+        self.queries = 0
+        self.common_phrase_hits = 0
+        self.local_hits = 0
+        self.llm_calls = 0
+        self.fallbacks = 0
 
-        # Load query cache
-        self.query_cache = self.load_query_cache()
+        # Classification chains, built on first use unless injected
+        self.chain = chain
+        self.batch_chain = batch_chain
+        self._chain_lock = asyncio.Lock()
+        self.chain_init_ms: Optional[float] = None
 
-        # Create prompt templates
-        self.system_message_prompt = SystemMessagePromptTemplate.from_template(
-            QUERY_SYSTEM_TEMPLATE
+        # Every LLM call waits for one of a bounded number of slots, by priority
+        self.llm_scheduler = PriorityScheduler(
+            max_concurrency=QUERY_LLM_MAX_CONCURRENCY,
+            max_queue=QUERY_LLM_MAX_QUEUE,
+            timeout=QUERY_LLM_TIMEOUT,
         )
-        self.human_message_prompt = HumanMessagePromptTemplate.from_template(
-            template="{input}"
+
+        # Queries reaching the LLM close together are classified in one batch
+        self.llm_flight = SingleFlight()
+        self.llm_batcher = (
+            MicroBatcher(
+                self._classify_batch,
+                max_batch_size=QUERY_BATCH_MAX_SIZE,
+                max_wait=QUERY_BATCH_MAX_WAIT_MS / 1000,
+            )
+            if QUERY_BATCH_MAX_SIZE > 1
+            else None
+        )
+
+    def _build_chains(self):
+        """Build the GPT-4o chains. Blocking (imports LangChain); run it in a thread."""
+        started = time.perf_counter()
+        from langchain_core.output_parsers import PydanticOutputParser
+        from langchain_core.prompts import (
+            ChatPromptTemplate,
+            HumanMessagePromptTemplate,
+            SystemMessagePromptTemplate,
+        )
+        from langchain_openai import ChatOpenAI
+
+        _install_llm_cache()
+
+        llm = ChatOpenAI(
+            temperature=LLM_TEMPERATURE, model_name=LLM_MODEL_NAME, api_key=API_KEY
+        )
+        system_message_prompt = SystemMessagePromptTemplate.from_template(
+            QUERY_SYSTEM_TEMPLATE
         )
 
         # Create the chat prompt
-        self.chat_prompt = ChatPromptTemplate.from_messages(
-            [self.system_message_prompt, self.human_message_prompt]
+        chat_prompt = ChatPromptTemplate.from_messages(
+            [
+                system_message_prompt,
+                HumanMessagePromptTemplate.from_template(template="{input}"),
+            ]
+        )
+
+        # Same rules, several queries answered in one completion
+        batch_prompt = ChatPromptTemplate.from_messages(
+            [
+                system_message_prompt,
+                HumanMessagePromptTemplate.from_template(QUERY_BATCH_HUMAN_TEMPLATE),
+            ]
+        )
+
+        # Initialize chains using pipe syntax; the single-query chain is set
+        # last since it marks the chains as ready
+        self.batch_chain = (
+            batch_prompt | llm | PydanticOutputParser(pydantic_object=QueryIntentBatch)
+        )
+        self.chain = (
+            chat_prompt | llm | PydanticOutputParser(pydantic_object=QueryIntent)
         )
+        self.chain_init_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"LLM chains initialized in {self.chain_init_ms:.0f} ms")
 
-        # Initialize chain using pipe syntax
-        self.chain = self.chat_prompt | self.llm | self.parser
+    async def _ensure_chains(self):
+        """Build the default chains on first use without blocking other requests"""
+        if self.chain is not None:
+            return
+        async with self._chain_lock:
+            if self.chain is None:
+                await asyncio.to_thread(self._build_chains)
 
-    async def save_query_cache(self):
-        """Save the query cache to a JSON file asynchronously"""
+    async def save_query_cache(self, question: str, result: Tuple[str, dict]):
+        """Append the new entry to the query cache journal asynchronously"""
         try:
-            async with aiofiles.open("query_cache.json", "w") as cache_file:
-                await cache_file.write(json.dumps(self.query_cache))
-            logger.info("Query cache saved successfully")
+            await asyncio.to_thread(self.query_cache.persist, question, result)
         except Exception as e:
             logger.error(f"Error saving query cache: {str(e)}")
+            return
 
-    def load_query_cache(self):
-        """Load the query cache from a JSON file"""
+        # Rewrite the journal in the background once it is mostly superseded records
+        if self.query_cache.needs_compaction() and (
+            self._compaction is None or self._compaction.done()
+        ):
+            self._compaction = asyncio.create_task(self._compact_query_cache())
+
+    async def _compact_query_cache(self):
         try:
-            with open(QUERY_CACHE_FILE, "r") as cache_file:
-                return json.load(cache_file)
-        except FileNotFoundError:
-            logger.info("Query cache file not found. Starting with empty cache")
-            return {}
+            await asyncio.to_thread(self.query_cache.compact)
+            logger.info("Query cache journal compacted")
         except Exception as e:
-            logger.error(f"Error loading query cache: {str(e)}")
-            return {}
+            logger.error(f"Error compacting query cache: {str(e)}")
+
+    async def aclose(self):
+        """Stop the background journal compaction and close the journal."""
+        if self._compaction is not None and not self._compaction.done():
+            self._compaction.cancel()
+            try:
+                await self._compaction
+            except asyncio.CancelledError:
+                pass
+        # Waits for a compaction already running in its thread to finish
+        await asyncio.to_thread(self.query_cache.close)
+
+    def _load_query_cache(self):
+        """Loads the persisted query cache and indexes it for similarity lookups"""
+        self.query_cache.load()
+        if self.semantic_cache is not None:
+            self.semantic_cache.add_many(self.query_cache.cache.items())
+
+    async def _invoke_chain(
+        self, question: str, priority: int, timeout: Optional[float] = None
+    ) -> QueryIntent:
+        async def call() -> QueryIntent:
+            # Counted once the scheduler starts the call, not when it is rejected
+            self.llm_calls += 1
+            return await self.chain.ainvoke({"input": question})
+
+        return await self.llm_scheduler.run(call, priority, timeout)
+
+    async def _classify_batch(self, items: List[Tuple[str, int]]) -> List:
+        """
+        Classify a batch of (query, priority) with one multi-query completion.
+
+        The batch is scheduled at its most urgent priority. It falls back to one
+        chain call per query when there is no batch chain or its answer does not
+        hold one classification per query. Those calls get what is left of the
+        batch's deadline, so the whole batch stays within QUERY_LLM_TIMEOUT.
+        """
+        questions = [question for question, _ in items]
+        priority = min(priority for _, priority in items)
+        loop = asyncio.get_running_loop()
+        timeout = self.llm_scheduler.timeout
+        deadline = loop.time() + timeout if timeout is not None else None
+        if len(questions) > 1 and self.batch_chain is not None:
+
+            async def call() -> QueryIntentBatch:
+                self.llm_calls += 1
+                return await self.batch_chain.ainvoke(
+                    {
+                        "queries": "\n".join(
+                            f"{i}. {question}"
+                            for i, question in enumerate(questions, start=1)
+                        )
+                    }
+                )
+
+            try:
+                result = await self.llm_scheduler.run(call, priority)
+                if len(result.results) == len(questions):
+                    return result.results
+                logger.warning(
+                    f"Batch classification returned {len(result.results)} results "
+                    f"for {len(questions)} queries, classifying them one by one"
+                )
+            except (asyncio.TimeoutError, SchedulerOverloaded):
+                raise  # One call per query would miss the deadline as well
+            except Exception as e:
+                logger.warning(
+                    f"Batch classification failed, classifying one by one: {str(e)}"
+                )
+
+        if deadline is not None:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                raise asyncio.TimeoutError()
+        return await asyncio.gather(
+            *(
+                self._invoke_chain(question, priority, timeout)
+                for question in questions
+            ),
+            return_exceptions=True,
+        )
+
+    async def _classify_with_llm(self, question: str, priority: int) -> QueryIntent:
+        """Classify with the LLM, sharing one call among concurrent identical queries"""
+        await self._ensure_chains()
+
+        async def call() -> QueryIntent:
+            if self.llm_batcher is None:
+                return await self._invoke_chain(question, priority)
+            return await self.llm_batcher.submit((question, priority))
+
+        return await self.llm_flight.do(normalize_query(question), call)
+
+    def _fallback(self, question: str) -> Tuple[Optional[str], dict]:
+        """
+        Fast answer for a query whose LLM call timed out or was rejected: the
+        closest earlier answer under a looser threshold, else the default result.
+        """
+        if self.semantic_cache is not None:
+            result = self.semantic_cache.get(
+                question, threshold=QUERY_FALLBACK_SEMANTIC_THRESHOLD
+            )
+            if result:
+                return result
+        intent, params = QUERY_FALLBACK_RESULT
+        return intent, dict(params)
 
     def check_common_phrases(self, query: str) -> Optional[Tuple[str, dict]]:
         """Check if query matches any common phrases"""
-        query_lower = query.lower().strip()
-        return COMMON_PHRASES.get(query_lower)
+        return COMMON_PHRASES.get(normalize_query(query))
 
-    async def classify_query(self, question: str) -> Tuple[Optional[str], dict]:
+    async def classify_query(
+        self, question: str, priority: int = 0
+    ) -> Tuple[Optional[str], dict]:
         """Classify query intent and extract parameters using LangChain"""
+        intent, params, _ = await self.classify_query_with_source(question, priority)
+        return intent, params
+
+    async def classify_query_with_source(
+        self, question: str, priority: int = 0
+    ) -> Tuple[Optional[str], dict, str]:
+        """
+        Classify a query and report where the classification came from.
+
+        Args:
+            question (str): Raw user query
+            priority (int): Scheduling priority of the LLM call if one is needed;
+                lower values run first
+
+        Returns:
+            Tuple[Optional[str], dict, str]: intent, params and the source: one
+            of "cache", "common_phrase", "local", "semantic", "llm" or
+            "fallback" (the LLM call timed out or was rejected)
+        """
+        self.queries += 1
+        if not self.query_cache.loaded:
+            await asyncio.to_thread(self._load_query_cache)
+
         # Check cache first
-        cache_key = question.lower().strip()
-        if cache_key in self.query_cache:
-            return self.query_cache[cache_key]
+        cached_result = self.query_cache.get(question)
+        if cached_result:
+            return (*cached_result, "cache")
 
         # Check common phrases
         common_result = self.check_common_phrases(question)
         if common_result:
-            return common_result
+            self.common_phrase_hits += 1
+            return (*common_result, "common_phrase")
+
+        # Resolve high-confidence queries with local rules
+        if QUERY_LOCAL_CLASSIFIER:
+            local_result = classify_locally(question)
+            if local_result:
+                self.local_hits += 1
+                return (*local_result, "local")
+
+        # Reuse the result of a similar earlier query
+        if self.semantic_cache is not None:
+            semantic_result = self.semantic_cache.get(question)
+            if semantic_result:
+                return (*semantic_result, "semantic")
 
         try:
-            # Run the chain with corrected input parameter
-            result = await self.chain.ainvoke({"input": question})
+            # Run the chain, batched with other queries arriving at the same time
+            result = await self._classify_with_llm(question, priority)
 
             # Handle irrelevant queries
             if result.intent == "irrelevant":
-                return None, {}
+                return None, {}, "llm"
 
             # Process the result
             processed_result = await self._process_result(result)
 
             # Cache the result
-            self.query_cache[cache_key] = processed_result
-            await self.save_query_cache()
+            self.query_cache.set(question, processed_result)
+            if self.semantic_cache is not None:
+                self.semantic_cache.add(question, processed_result)
+            await self.save_query_cache(question, processed_result)
+
+            return (*processed_result, "llm")
 
-            return processed_result
+        except (asyncio.TimeoutError, SchedulerOverloaded) as e:
+            reason = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+            logger.warning(f"LLM classification {reason} for query: {question}")
+            if not QUERY_LLM_FALLBACK:
+                return None, {}, "fallback"
+            self.fallbacks += 1
+            return (*self._fallback(question), "fallback")
 
         except Exception as e:
             logger.error(f"Error in query classification: {str(e)}")
-            return None, {}
+            return None, {}, "llm"
+
+    def cache_stats(self) -> dict:
+        """Cache counters and the fraction of queries answered without the LLM."""
+        return {
+            **self.query_cache.stats(),
+            **(self.semantic_cache.stats() if self.semantic_cache is not None else {}),
+            "queries": self.queries,
+            "common_phrase_hits": self.common_phrase_hits,
+            "local_hits": self.local_hits,
+            "llm_calls": self.llm_calls,
+            "llm_batches": (
+                self.llm_batcher.stats() if self.llm_batcher is not None else None
+            ),
+            "llm_single_flight": self.llm_flight.stats(),
+            "llm_scheduler": self.llm_scheduler.stats(),
+            "llm_fallbacks": self.fallbacks,
+            "llm_chain_init_ms": self.chain_init_ms,
+            "llm_avoided_rate": (
+                1 - self.llm_calls / self.queries if self.queries else 0.0
+            ),
+        }
 
     async def _process_result(
         self, query_result: QueryIntent
@@ -142,23 +447,32 @@ class QueryProcessor:
             logger.error(f"Error processing classification result: {str(e)}")
             return None, {}
 
-    async def process_query(self, query: str) -> Tuple[Optional[str], dict]:
+    async def process_query(
+        self, query: str, priority: int = 0
+    ) -> Tuple[Optional[str], dict]:
         """Main method to process user queries"""
+        intent, params, _ = await self.process_query_with_source(query, priority)
+        return intent, params
+
+    async def process_query_with_source(
+        self, query: str, priority: int = 0
+    ) -> Tuple[Optional[str], dict, str]:
+        """Process a user query, also returning the classification source"""
         if not query or not isinstance(query, str):
             logger.error("Invalid query input")
-            return None, {}
+            return None, {}, "invalid"
 
         # Clean and normalize query
         query = query.strip()
         if not query:
-            return None, {}
+            return None, {}, "invalid"
 
         # Get classification and parameters
-        intent, params = await self.classify_query(query)
+        intent, params, source = await self.classify_query_with_source(query, priority)
 
         # Log the result
         logger.info(f"Query: {query}")
-        logger.info(f"Classified intent: {intent}")
+        logger.info(f"Classified intent: {intent} ({source})")
         logger.info(f"Extracted params: {params}")
 
-        return intent, params
+        return intent, params, source
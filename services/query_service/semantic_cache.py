@@ -0,0 +1,225 @@
+import re
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.query_service.intent_rules import (
+    CASHTAG,
+    HANDLE,
+    INTENT_PATTERNS,
+    content_words,
+)
+from services.query_service.query_cache import normalize_query
+
+# Character n-gram lengths hashed into each query vector, on top of whole words
+NGRAM_SIZES = (3, 4, 5)
+# Candidates checked against the guard, best score first
+TOP_CANDIDATES = 5
+# Params that repeat the query itself, rewritten for the query that hit
+ECHO_PARAMS = {"stupid_question": "question"}
+
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+def embed(question: str, dim: int) -> np.ndarray:
+    """
+    Embeds a query as a unit-length hashed bag of words and character n-grams.
+
+    Each word and each n-gram of the space-padded word is hashed with CRC32 into
+    one of `dim` signed buckets, so no vocabulary or model is needed and the
+    same query always maps to the same vector.
+
+    Args:
+        question (str): Raw user query
+        dim (int): Vector size
+
+    Returns:
+        np.ndarray: float32 vector of norm 1 (all zeros for an empty query)
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in normalize_query(question).split():
+        padded = f" {word} "
+        features = [f"w:{word}"]
+        for size in NGRAM_SIZES:
+            features.extend(padded[i : i + size] for i in range(len(padded) - size + 1))
+        for feature in features:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            vector[digest % dim] += 1.0 if digest & 0x80000000 else -1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def query_guard(question: str) -> Tuple:
+    """
+    Parameters two queries must share for one to reuse the other's result.
+
+    Similar wording is not enough when the intent phrases of `intent_rules`,
+    the period, numbers, @handles, $cashtags or any other non-filler word
+    differ ("best call" vs "best calls", "top gainers today" vs "top gainers
+    this month", "when did ansem call wif" vs "when did ansem call bonk").
+    """
+    text = normalize_query(question)
+    period, words = content_words(text)
+    return (
+        frozenset(
+            intent for intent, pattern in INTENT_PATTERNS if pattern.search(text)
+        ),
+        period,
+        frozenset(_NUMBER.findall(text)),
+        frozenset(handle.lower() for handle in HANDLE.findall(question)),
+        frozenset(symbol.lower() for symbol in CASHTAG.findall(question)),
+        words,
+    )
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of query classifications.
+
+    Queries are embedded with `embed` into a fixed-size matrix, and a lookup
+    returns the result of the most similar stored query whose cosine similarity
+    is at least `threshold` and whose `query_guard` matches, so paraphrases
+    ("who are the best kols" / "top kols") share one LLM result. The matrix
+    holds up to `max_size` queries; the oldest is overwritten when it is full.
+    Entries expire after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        max_size: int,
+        ttl: Optional[float] = None,
+        dim: int = 1024,
+    ):
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl = ttl
+        self.dim = dim
+        self.lock = threading.Lock()
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.expires = np.zeros(0, dtype=np.float64)
+        self.keys: List[Optional[str]] = []
+        self.guards: List[Tuple] = []
+        self.results: List[Tuple[str, dict]] = []
+        self.slots: Dict[str, int] = {}
+        self.next_slot = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def _grow(self):
+        """Doubles the matrix, up to `max_size` rows."""
+        capacity = min(max(2 * len(self.keys), 64), self.max_size)
+        added = capacity - len(self.keys)
+        self.vectors = np.vstack(
+            [self.vectors, np.zeros((added, self.dim), dtype=np.float32)]
+        )
+        self.expires = np.concatenate([self.expires, np.zeros(added)])
+        self.keys.extend([None] * added)
+        self.guards.extend([()] * added)
+        self.results.extend([(None, {})] * added)
+
+    def add(self, question: str, result: Tuple[str, dict], ttl: Optional[float] = None):
+        """
+        Stores the classification of a query, replacing an identical query's.
+
+        Args:
+            question (str): Raw user query
+            result (Tuple[str, dict]): (intent, params) returned for it
+            ttl (float, optional): Seconds until it expires; defaults to `self.ttl`
+        """
+        key = normalize_query(question)
+        if not key or self.max_size <= 0:
+            return
+        vector = embed(question, self.dim)
+        guard = query_guard(question)
+        ttl = ttl if ttl is not None else self.ttl
+        expires = time.time() + ttl if ttl is not None else np.inf
+        intent, params = result
+
+        with self.lock:
+            slot = self.slots.get(key)
+            if slot is None:
+                if self.next_slot >= len(self.keys) and len(self.keys) < self.max_size:
+                    self._grow()
+                slot = self.next_slot % self.max_size
+                self.next_slot = slot + 1
+                old_key = self.keys[slot]
+                if old_key is not None:
+                    del self.slots[old_key]
+                self.slots[key] = slot
+                self.keys[slot] = key
+
+            self.vectors[slot] = vector
+            self.expires[slot] = expires
+            self.guards[slot] = guard
+            self.results[slot] = (intent, dict(params))
+
+    def add_many(
+        self, entries: Iterable[Tuple[str, Tuple[str, dict], Optional[float]]]
+    ):
+        """Stores (question, result, ttl) entries, e.g. the persisted query cache."""
+        for question, result, ttl in entries:
+            self.add(question, result, ttl)
+
+    def get(
+        self, question: str, threshold: Optional[float] = None
+    ) -> Optional[Tuple[str, dict]]:
+        """
+        Looks up the result of the most similar stored query.
+
+        Args:
+            question (str): Raw user query
+            threshold (float, optional): Minimum similarity for this lookup;
+                defaults to `self.threshold`
+
+        Returns:
+            Optional[Tuple[str, dict]]: (intent, params), or None if no stored
+            query is similar enough
+        """
+        vector = embed(question, self.dim)
+        guard = query_guard(question)
+        threshold = threshold if threshold is not None else self.threshold
+
+        with self.lock:
+            if not self.slots:
+                self.misses += 1
+                return None
+            scores = self.vectors @ vector
+            scores[self.expires <= time.time()] = -1.0
+
+            count = min(TOP_CANDIDATES, len(scores))
+            candidates = np.argpartition(scores, -count)[-count:]
+            match = None
+            for slot in candidates[np.argsort(scores[candidates])[::-1]]:
+                if scores[slot] < threshold:
+                    break
+                if self.guards[slot] == guard:
+                    match = self.results[slot]
+                    break
+            if match is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        intent, params = match[0], dict(match[1])
+        if intent in ECHO_PARAMS:
+            params[ECHO_PARAMS[intent]] = question.lower()
+        return intent, params
+
+    def stats(self) -> Dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "semantic_size": len(self.slots),
+                "semantic_hits": self.hits,
+                "semantic_misses": self.misses,
+                "semantic_hit_rate": self.hits / lookups if lookups else 0.0,
+                "semantic_threshold": self.threshold,
+            }
@@ -73,3 +73,8 @@ Example Mappings:
 "Tell me about your platform features" ->
     {{ "intent": "platform_info", "params": {{ "type": "features" }} }}
 """
+
+QUERY_BATCH_HUMAN_TEMPLATE = """Classify each of the following numbered queries independently, applying the rules above to each one.
+Return a JSON object {{ "results": [...] }} whose list holds exactly one {{ "intent": ..., "params": {{ ... }} }} object per query, in the same order as the queries.
+
+{queries}"""
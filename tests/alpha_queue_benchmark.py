@@ -0,0 +1,127 @@
+"""
+Multi-process benchmark for the alpha FileQueue.
+
+Runs 1..N enqueuing processes and as many reading processes against one queue
+directory at the same time, so reads contend with writes for the queue lock,
+then checks that no entry was lost, duplicated or torn.
+
+    python -m tests.alpha_queue_benchmark --max-workers 8 --entries 2000
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.file_queue import FileQueue  # noqa: E402
+
+SAMPLE_TOKEN = {
+    "chain": "solana",
+    "amount": 5,
+    "tokenName": "Benchmark",
+    "tokenAddress": "So11111111111111111111111111111111111111112",
+    "tokenSymbol": "BENCH",
+    "fdv": 1250000.0,
+    "chainName": "Solana",
+}
+
+
+def _enqueue_worker(path: str, worker: int, entries: int, start, results):
+    queue = FileQueue(path, fsync_policy="never")
+    start.wait()
+    began = time.perf_counter()
+    for i in range(entries):
+        queue.enqueue({**SAMPLE_TOKEN, "worker": worker, "i": i})
+    results.put(time.perf_counter() - began)
+
+
+def _read_worker(path: str, worker: int, reads: int, start, results):
+    queue = FileQueue(path, fsync_policy="never")
+    start.wait()
+    began = time.perf_counter()
+    for _ in range(reads):
+        # Poll the latest 100 entries, like an alert bot catching up
+        queue.get_entries_after_offset(max(queue.head()[1] - 100, 0))
+    results.put(time.perf_counter() - began)
+
+
+def _run(path: str, workers: int, entries: int, reads: int) -> tuple:
+    """
+    Runs `workers` enqueuing and `workers` reading processes together.
+
+    Returns:
+        tuple: The slowest enqueuing and the slowest reading process's elapsed time
+    """
+    start = multiprocessing.Event()
+    groups = {}
+    for target, operations in ((_enqueue_worker, entries), (_read_worker, reads)):
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=target, args=(path, worker, operations, start, results)
+            )
+            for worker in range(workers)
+        ]
+        groups[target] = (processes, results)
+    for processes, _ in groups.values():
+        for process in processes:
+            process.start()
+    time.sleep(0.5)  # Let every worker open the queue
+    start.set()
+    elapsed = [
+        max(results.get() for _ in processes) for processes, results in groups.values()
+    ]
+    for processes, _ in groups.values():
+        for process in processes:
+            process.join()
+    return tuple(elapsed)
+
+
+def _verify(path: str, workers: int, entries: int) -> str:
+    data = FileQueue(path).dequeue_without_removal()
+    expected = workers * entries
+    seqs = [entry["seq"] for entry in data]
+    seen = {(entry["worker"], entry["i"]) for entry in data}
+    if len(data) != expected:
+        return f"FAIL: {len(data)}/{expected} entries"
+    if seqs != list(range(expected)):
+        return "FAIL: sequence numbers not contiguous"
+    if len(seen) != expected:
+        return "FAIL: duplicated entries"
+    return "ok"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--entries", type=int, default=2000, help="per worker")
+    parser.add_argument("--reads", type=int, default=2000, help="per worker")
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'enqueue/s':>12} {'reads/s':>12}  check")
+    workers = 1
+    while workers <= args.max_workers:
+        directory = tempfile.mkdtemp(prefix="alpha_queue_bench_")
+        path = os.path.join(directory, "alpha_queue.jsonl")
+        try:
+            # Create the log before workers race to create it
+            FileQueue(path)
+            enqueue_elapsed, read_elapsed = _run(
+                path, workers, args.entries, args.reads
+            )
+            enqueue_rate = workers * args.entries / enqueue_elapsed
+            read_rate = workers * args.reads / read_elapsed
+            check = _verify(path, workers, args.entries)
+            print(f"{workers:>7} {enqueue_rate:>12,.0f} {read_rate:>12,.0f}  {check}")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Compares the JSONL and binary record formats of the alpha FileQueue.
+
+Writes the same entries in each format, then reports the log size and the time
+to read the whole log and to read the newest entries by timestamp from disk.
+Use one large segment with a sparse index to exercise the memory-mapped
+binary search:
+
+    python -m tests.alpha_queue_format_benchmark --entries 100000
+    python -m tests.alpha_queue_format_benchmark --segment-max-bytes 1000000000 \
+        --index-interval-bytes 100000000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.file_queue import RECORD_FORMATS, FileQueue  # noqa: E402
+
+SAMPLE_TOKEN = {
+    "chain": "solana",
+    "amount": 5,
+    "tokenName": "Benchmark",
+    "tokenAddress": "So11111111111111111111111111111111111111112",
+    "tokenSymbol": "BENCH",
+    "fdv": 1250000.0,
+    "chainName": "Solana",
+}
+
+
+def _best_of(runs: int, fn) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        began = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - began)
+    return best
+
+
+def _bench(path: str, record_format: str, args) -> dict:
+    entries, runs = args.entries, args.runs
+    queue = FileQueue(
+        path,
+        segment_max_bytes=args.segment_max_bytes,
+        index_interval_bytes=args.index_interval_bytes,
+        max_segments=None,
+        fsync_policy="never",
+        recent_capacity=0,  # Force disk reads
+        multiprocess=False,
+        record_format=record_format,
+    )
+    for start in range(0, entries, 1000):
+        queue.enqueue_many(
+            [{**SAMPLE_TOKEN, "amount": i} for i in range(start, start + 1000)]
+        )
+    queue.close()
+
+    # Timestamp of the entry 1% from the end, so the read returns the newest 1%
+    tail = queue.get_entries_after_offset(entries - entries // 100 - 1, 1)[0]
+    timestamp = tail[0]["timestamp"]
+    newest = queue.get_entries_after_offset(entries - 11, 1)[0][0]["timestamp"]
+    assert len(queue.dequeue_without_removal()) == entries
+
+    return {
+        "bytes": sum(segment.size for segment in queue.segments),
+        "read_all": _best_of(runs, queue.dequeue_without_removal),
+        "after_ts": _best_of(
+            runs, lambda: queue.get_entries_after_timestamp(timestamp)
+        ),
+        "newest": _best_of(runs, lambda: queue.get_entries_after_timestamp(newest)),
+        # Without the sparse index, every record before the timestamp is scanned
+        "scan_ts": _best_of(
+            runs,
+            lambda: [
+                entry
+                for segment in queue.segments
+                for entry in segment.read(after=timestamp)
+            ],
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--segment-max-bytes", type=int, default=4 * 1024 * 1024)
+    parser.add_argument("--index-interval-bytes", type=int, default=4096)
+    args = parser.parse_args()
+
+    print(
+        f"{'format':>7} {'size (MB)':>10} {'read all (ms)':>14} "
+        f"{'newest 1% (ms)':>15} {'newest 10 (ms)':>15} {'full ts scan (ms)':>18}"
+    )
+    for record_format in RECORD_FORMATS:
+        directory = tempfile.mkdtemp(prefix="alpha_queue_format_")
+        try:
+            result = _bench(
+                os.path.join(directory, "alpha_queue.jsonl"), record_format, args
+            )
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        print(
+            f"{record_format:>7} {result['bytes'] / 1e6:>10.2f} "
+            f"{result['read_all'] * 1000:>14.1f} {result['after_ts'] * 1000:>15.2f} "
+            f"{result['newest'] * 1000:>15.3f} {result['scan_ts'] * 1000:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
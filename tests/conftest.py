@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# Import the app's packages when pytest runs from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Services create their queue and cache files under the working directory at
+# import time; keep them out of the repository
+os.chdir(tempfile.mkdtemp(prefix="package_tests_"))
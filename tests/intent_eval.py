@@ -0,0 +1,82 @@
+"""
+Evaluates the local rule classifier against a labeled query corpus.
+
+Each corpus line is {"query": ..., "intent": ..., "params": ...} with the
+classification the LLM is expected to return. Reports the share of queries the
+rules resolve without an LLM call, the accuracy of those resolutions and every
+query the rules got wrong:
+
+    python -m tests.intent_eval
+    python -m tests.intent_eval --corpus my_queries.jsonl --show-unresolved
+"""
+
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.query_service.intent_rules import classify_locally  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(ROOT, "tests", "data", "intent_corpus.jsonl")
+
+
+def load_corpus(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument(
+        "--show-unresolved",
+        action="store_true",
+        help="Also list the queries left to the LLM",
+    )
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    resolved, wrong, unresolved = 0, [], []
+    for sample in corpus:
+        result = classify_locally(sample["query"])
+        if result is None:
+            unresolved.append(sample)
+            continue
+        resolved += 1
+        if result != (sample["intent"], sample["params"]):
+            wrong.append((sample, result))
+
+    total = len(corpus)
+    correct = resolved - len(wrong)
+    print(f"queries:          {total}")
+    print(
+        f"resolved locally: {resolved} ({resolved / total:.1%} fewer LLM calls)"
+        if total
+        else "resolved locally: 0"
+    )
+    print(
+        f"accuracy:         {correct}/{resolved} "
+        f"({correct / resolved:.1%} of local resolutions)"
+        if resolved
+        else "accuracy:         n/a"
+    )
+
+    if wrong:
+        print("\nmisclassified:")
+        for sample, (intent, params) in wrong:
+            print(f"  {sample['query']!r}")
+            print(f"    expected {sample['intent']} {sample['params']}")
+            print(f"    got      {intent} {params}")
+    if args.show_unresolved and unresolved:
+        print("\nleft to the LLM:")
+        for sample in unresolved:
+            print(f"  {sample['query']!r} -> {sample['intent']}")
+
+    sys.exit(1 if wrong else 0)
+
+
+if __name__ == "__main__":
+    main()
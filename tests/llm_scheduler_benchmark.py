@@ -0,0 +1,140 @@
+"""
+Measures query latency during a traffic spike with and without the LLM scheduler.
+
+A fake LLM slows down as more requests are in flight, like an overloaded
+provider, and a few of its calls hang for much longer. A spike of interactive
+queries (priority 0) and bulk queries (priority 5) is sent at once. It is
+replayed with an unbounded scheduler (no concurrency cap, no deadline) and with
+the configured cap, queue limit and deadline. Latency percentiles and the share of
+queries answered with a fallback instead of an LLM classification are reported
+per priority:
+
+    python -m tests.llm_scheduler_benchmark
+    python -m tests.llm_scheduler_benchmark --queries 400 --timeout 1.5
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Send every query to the LLM, one call per query
+os.environ["QUERY_LOCAL_CLASSIFIER"] = "false"
+os.environ["QUERY_SEMANTIC_CACHE"] = "false"
+os.environ["QUERY_BATCH_MAX_SIZE"] = "1"
+
+from langchain_core.runnables import RunnableLambda  # noqa: E402
+
+from schemas.query_service_schemas.query_schemas import QueryIntent  # noqa: E402
+from services.query_service.query_processor import QueryProcessor  # noqa: E402
+from utils.priority_scheduler import PriorityScheduler  # noqa: E402
+
+# One warning per fallback would bury the table
+logging.getLogger("services.query_service.query_processor").setLevel(logging.ERROR)
+
+
+def overloaded_llm(args, seed: int) -> RunnableLambda:
+    rng = random.Random(seed)
+    state = {"in_flight": 0}
+
+    async def classify(inputs: dict) -> QueryIntent:
+        state["in_flight"] += 1
+        try:
+            # Latency grows with the load beyond the provider's capacity
+            load = max(1.0, state["in_flight"] / args.capacity)
+            latency = args.latency * load
+            if rng.random() < args.hang_rate:
+                latency *= 10
+            await asyncio.sleep(latency)
+        finally:
+            state["in_flight"] -= 1
+        return QueryIntent(intent="top_gainers", params={"period": "week"})
+
+    return RunnableLambda(classify)
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_spike(args, scheduled: bool) -> dict:
+    # The query cache journal is written to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="llm_scheduler_"))
+    processor = QueryProcessor(chain=overloaded_llm(args, seed=1))
+    if scheduled:
+        processor.llm_scheduler = PriorityScheduler(
+            max_concurrency=args.concurrency,
+            max_queue=args.max_queue,
+            timeout=args.timeout,
+        )
+    else:
+        processor.llm_scheduler = PriorityScheduler(max_concurrency=10**9)
+
+    latencies = {0: [], 5: []}
+    fallbacks = {0: 0, 5: 0}
+
+    async def one(i: int):
+        priority = 0 if i % 4 == 0 else 5
+        began = time.perf_counter()
+        _, _, source = await processor.classify_query_with_source(
+            f"spike query {i}", priority
+        )
+        latencies[priority].append(time.perf_counter() - began)
+        fallbacks[priority] += source == "fallback"
+
+    began = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.queries)))
+    elapsed = time.perf_counter() - began
+    return {
+        "latencies": latencies,
+        "fallbacks": fallbacks,
+        "elapsed": elapsed,
+        "scheduler": processor.llm_scheduler.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--hang-rate", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-queue", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'mode':>10} {'priority':>8} {'p50 (s)':>8} {'p95 (s)':>8} "
+        f"{'p99 (s)':>8} {'max (s)':>8} {'fallback':>8}"
+    )
+    for scheduled in (False, True):
+        result = asyncio.run(run_spike(args, scheduled))
+        mode = "scheduled" if scheduled else "unbounded"
+        for priority, values in result["latencies"].items():
+            print(
+                f"{mode:>10} {priority:>8} {percentile(values, 0.5):>8.2f} "
+                f"{percentile(values, 0.95):>8.2f} {percentile(values, 0.99):>8.2f} "
+                f"{max(values):>8.2f} "
+                f"{result['fallbacks'][priority] / len(values):>8.1%}"
+            )
+        stats = result["scheduler"]
+        fallbacks = sum(result["fallbacks"].values())
+        print(
+            f"{'':>10} fallbacks {fallbacks}/{args.queries} "
+            f"({fallbacks / args.queries:.1%}), timeouts {stats['timeouts']}, "
+            f"rejected {stats['rejected']}, max queued {stats['max_queued']}, "
+            f"spike drained in {result['elapsed']:.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
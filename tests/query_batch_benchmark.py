@@ -0,0 +1,128 @@
+"""
+Replays a burst of queries through QueryProcessor against a local fake LLM.
+
+The fake LLM serves a limited number of requests at a time, like a rate-limited
+provider. A request takes a fixed latency, plus a small cost for each extra
+query in a multi-query prompt. The same burst is run three ways:
+
+- unbatched: one `ainvoke` per query
+- abatch: micro-batches sent as one request per query
+- prompt: micro-batches sent as one multi-query request
+
+In every mode, concurrent repeats of a query share one classification. No
+OpenAI key or network access is needed:
+
+    python -m tests.query_batch_benchmark
+    python -m tests.query_batch_benchmark --queries 500 --distinct 400 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Send every query to the LLM so only the batching differs between runs
+os.environ["QUERY_LOCAL_CLASSIFIER"] = "false"
+os.environ["QUERY_SEMANTIC_CACHE"] = "false"
+
+from langchain_core.runnables import RunnableLambda  # noqa: E402
+
+from schemas.query_service_schemas.query_schemas import (  # noqa: E402
+    QueryIntent,
+    QueryIntentBatch,
+)
+from services.query_service.query_processor import QueryProcessor  # noqa: E402
+
+ANSWER = QueryIntent(intent="top_gainers", params={"period": "week"})
+
+
+def fake_llm(args, counter: dict):
+    """Single-query and multi-query chains sharing one rate-limited provider."""
+    provider = asyncio.Semaphore(args.provider_concurrency)
+
+    async def request(queries: int):
+        async with provider:
+            counter["requests"] += 1
+            await asyncio.sleep(args.latency + args.per_query * (queries - 1))
+
+    async def classify(inputs: dict) -> QueryIntent:
+        await request(1)
+        return ANSWER
+
+    async def classify_batch(inputs: dict) -> QueryIntentBatch:
+        queries = inputs["queries"].count("\n") + 1
+        await request(queries)
+        return QueryIntentBatch(results=[ANSWER] * queries)
+
+    return RunnableLambda(classify), RunnableLambda(classify_batch)
+
+
+async def run_burst(queries: list, mode: str, args) -> dict:
+    # The query cache journal is written to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="query_batch_"))
+    counter = {"requests": 0}
+    chain, batch_chain = fake_llm(args, counter)
+    processor = QueryProcessor(
+        chain=chain, batch_chain=batch_chain if mode == "prompt" else None
+    )
+    if mode == "unbatched":
+        processor.llm_batcher = None
+
+    began = time.perf_counter()
+    results = await asyncio.gather(*(processor.process_query(q) for q in queries))
+    elapsed = time.perf_counter() - began
+    await asyncio.sleep(0)  # Let the journal appends finish
+
+    assert len(results) == len(queries)
+    assert all(intent == "top_gainers" for intent, _ in results)
+    stats = processor.cache_stats()
+    return {
+        "elapsed": elapsed,
+        "requests": counter["requests"],
+        "batches": stats["llm_batches"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=150)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument(
+        "--per-query",
+        type=float,
+        default=0.01,
+        help="Extra latency per additional query in a multi-query request",
+    )
+    parser.add_argument("--provider-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    queries = [
+        f"question number {rng.randrange(args.distinct)} about the market"
+        for _ in range(args.queries)
+    ]
+
+    print(f"{'mode':>9} {'LLM requests':>13} {'burst time (s)':>15}  batches")
+    for mode in ("unbatched", "abatch", "prompt"):
+        result = asyncio.run(run_burst(queries, mode, args))
+        batches = result["batches"]
+        print(
+            f"{mode:>9} {result['requests']:>13} {result['elapsed']:>15.2f}  "
+            + (
+                f"{batches['batches']} (avg {batches['average_batch']:.1f}, "
+                f"max {batches['largest_batch']})"
+                if batches
+                else "-"
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Measures the semantic query cache's hit rate against its misclassifications.
+
+Replays the labeled intent corpus in shuffled order as a query stream, along
+with a noisy variant of each query (a filler word, a dropped article or a typo)
+that the exact-match cache would miss. Each query is looked up first. On a
+miss, its labeled classification is stored, as the LLM's answer would be. A hit that returns something other than the query's
+label counts as a misclassification. Reports both rates for a range of
+similarity thresholds:
+
+    python -m tests.semantic_cache_benchmark
+    python -m tests.semantic_cache_benchmark --thresholds 0.6 0.7 0.8 --rounds 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.query_service.semantic_cache import (  # noqa: E402
+    ECHO_PARAMS,
+    SemanticCache,
+)
+from tests.intent_eval import DEFAULT_CORPUS, load_corpus  # noqa: E402
+
+FILLERS = ["please", "hey", "can you tell me", "pls", "quick question"]
+
+
+def noisy_variant(query: str, rng: random.Random) -> str:
+    """Rewrites a query the way a user might retype it."""
+    words = query.split()
+    edit = rng.randrange(3)
+    if edit == 0:
+        words.insert(rng.choice([0, len(words)]), rng.choice(FILLERS))
+    elif edit == 1 and any(w.lower() in ("the", "a", "me") for w in words):
+        words.remove(next(w for w in words if w.lower() in ("the", "a", "me")))
+    else:
+        # Swap two adjacent letters of the longest plain word
+        word = max(words, key=lambda w: len(w) if w.isalpha() else 0)
+        if len(word) > 4 and word.isalpha():
+            i = rng.randrange(1, len(word) - 2)
+            typo = word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+            words[words.index(word)] = typo
+    return " ".join(words)
+
+
+def variant_sample(sample: dict, rng: random.Random) -> dict:
+    query = noisy_variant(sample["query"], rng)
+    params = dict(sample["params"])
+    if sample["intent"] in ECHO_PARAMS:
+        params[ECHO_PARAMS[sample["intent"]]] = query.lower()
+    return {**sample, "query": query, "params": params}
+
+
+def replay(corpus: list, threshold: float, seed: int, dim: int) -> dict:
+    rng = random.Random(seed)
+    stream = list(corpus) + [variant_sample(sample, rng) for sample in corpus]
+    rng.shuffle(stream)
+    cache = SemanticCache(threshold=threshold, max_size=len(stream), dim=dim)
+    hits, wrong, examples = 0, 0, []
+    for sample in stream:
+        expected = (sample["intent"], sample["params"])
+        result = cache.get(sample["query"])
+        if result is None:
+            cache.add(sample["query"], expected)
+            continue
+        hits += 1
+        if result != expected:
+            wrong += 1
+            examples.append((sample["query"], expected, result))
+    return {"hits": hits, "wrong": wrong, "examples": examples}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument(
+        "--thresholds",
+        type=float,
+        nargs="+",
+        default=[0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95],
+    )
+    parser.add_argument("--rounds", type=int, default=10, help="Shuffled replays")
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument(
+        "--show-errors", action="store_true", help="List the wrong hits"
+    )
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    lookups = 2 * len(corpus) * args.rounds
+    print(f"{'threshold':>9} {'hit rate':>9} {'wrong hits':>11} {'of hits':>8}")
+    for threshold in args.thresholds:
+        hits, wrong, examples = 0, 0, {}
+        for seed in range(args.rounds):
+            result = replay(corpus, threshold, seed, args.dim)
+            hits += result["hits"]
+            wrong += result["wrong"]
+            for query, expected, got in result["examples"]:
+                examples[query] = (expected, got)
+        print(
+            f"{threshold:>9.2f} {hits / lookups:>9.1%} {wrong / lookups:>11.1%} "
+            f"{wrong / hits if hits else 0.0:>8.1%}"
+        )
+        if args.show_errors:
+            for query, (expected, got) in examples.items():
+                print(f"    {query!r}: expected {expected}, got {got}")
+
+    # Lookup latency with a full cache
+    cache = SemanticCache(threshold=1.1, max_size=5000, dim=args.dim)
+    queries = [sample["query"] for sample in corpus]
+    for i in range(5000):
+        cache.add(f"{queries[i % len(queries)]} {i}", ("top_gainers", {}))
+    began = time.perf_counter()
+    for query in queries:
+        cache.get(query)
+    elapsed = (time.perf_counter() - began) / len(queries)
+    print(f"\nlookup with 5000 cached queries: {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
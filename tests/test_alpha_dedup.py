@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from services.alpha_view import queue_service
+from utils.file_queue import FileQueue
+from utils.ttl_cache import TTLCache
+
+TOKEN = {
+    "chain": "solana",
+    "amount": 5,
+    "tokenName": "Test",
+    "tokenAddress": "So11111111111111111111111111111111111111112",
+    "tokenSymbol": "TEST",
+    "fdv": 1000000.0,
+    "chainName": "Solana",
+}
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch) -> FileQueue:
+    queue = FileQueue(
+        str(tmp_path / "queue.jsonl"), fsync_policy="never", multiprocess=False
+    )
+    monkeypatch.setattr(queue_service, "file_queue", queue)
+    monkeypatch.setattr(queue_service, "DEDUP_ENABLED", True)
+    monkeypatch.setattr(queue_service, "dedup_index", TTLCache(max_size=100))
+    monkeypatch.setattr(queue_service, "dedup_stats", {"emitted": 0, "merged": 0})
+    monkeypatch.setattr(queue_service, "message_cache", TTLCache(max_size=100))
+    return queue
+
+
+def slow_first_enqueue(queue, monkeypatch, error=None) -> threading.Event:
+    """Holds the first enqueue_many call until the returned event is set."""
+    release = threading.Event()
+    enqueue_many = queue.enqueue_many
+    calls = []
+
+    def enqueue(entries):
+        calls.append(entries)
+        if len(calls) == 1:
+            release.wait(5)
+            if error is not None:
+                raise error
+        return enqueue_many(entries)
+
+    monkeypatch.setattr(queue, "enqueue_many", enqueue)
+    return release
+
+
+def enqueue_in_thread(entry: dict) -> tuple:
+    results = []
+
+    def run():
+        try:
+            results.append(queue_service._enqueue_entries([entry]))
+        except Exception as e:
+            results.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, results
+
+
+def test_repeat_waits_for_the_alert_being_written(queue, monkeypatch):
+    release = slow_first_enqueue(queue, monkeypatch)
+    first = enqueue_in_thread(TOKEN)
+    time.sleep(0.05)
+    repeat = enqueue_in_thread({**TOKEN, "amount": 6, "fdv": 1100000.0})
+    time.sleep(0.05)
+    release.set()
+    first[0].join()
+    repeat[0].join()
+
+    assert first[1] == [[(0, False)]]
+    assert repeat[1] == [[(0, True)]]
+    alert = queue_service.dedup_index.get(queue_service._dedup_key(TOKEN))[1]
+    assert (alert["merged"], alert["latest_amount"], alert["latest_fdv"]) == (
+        1,
+        6,
+        1100000.0,
+    )
+    assert queue_service.dedup_stats == {"emitted": 1, "merged": 1}
+
+
+def test_repeat_is_emitted_when_the_alert_fails_to_write(queue, monkeypatch):
+    release = slow_first_enqueue(queue, monkeypatch, error=OSError("disk full"))
+    first = enqueue_in_thread(TOKEN)
+    time.sleep(0.05)
+    repeat = enqueue_in_thread({**TOKEN, "amount": 6})
+    time.sleep(0.05)
+    release.set()
+    first[0].join()
+    repeat[0].join()
+
+    assert isinstance(first[1][0], OSError)
+    assert repeat[1] == [[(0, False)]]
+    assert [entry["amount"] for entry in queue.dequeue_without_removal()] == [6]
+    assert queue_service.dedup_stats == {"emitted": 1, "merged": 0}
+
+
+def test_repeats_in_one_batch_share_the_alert(queue):
+    results = queue_service._enqueue_entries([TOKEN, {**TOKEN, "amount": 7}])
+    assert results == [(0, False), (0, True)]
+    # Far enough from the emitted alert to be emitted again
+    assert queue_service._enqueue_entries([{**TOKEN, "amount": 8}]) == [(1, False)]
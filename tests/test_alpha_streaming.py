@@ -0,0 +1,147 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from routers import alpha_view
+from schemas.alpha_view.models import TokenRequest
+from services.alpha_view import queue_service
+from utils.async_notifier import AsyncNotifier
+from utils.file_queue import FileQueue
+from utils.ttl_cache import TTLCache
+
+TOKEN = TokenRequest(
+    chain="solana",
+    amount=5,
+    tokenName="Test",
+    tokenAddress="So11111111111111111111111111111111111111112",
+    tokenSymbol="TEST",
+    fdv=1000000.0,
+    chainName="Solana",
+)
+
+
+class ConnectedRequest:
+    """Stands in for the Starlette request of a client that stays connected."""
+
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+@pytest.fixture(autouse=True)
+def queue(tmp_path, monkeypatch) -> FileQueue:
+    queue = FileQueue(
+        str(tmp_path / "queue.jsonl"), fsync_policy="never", multiprocess=False
+    )
+    monkeypatch.setattr(queue_service, "file_queue", queue)
+    monkeypatch.setattr(queue_service, "queue_notifier", AsyncNotifier())
+    monkeypatch.setattr(queue_service, "message_cache", TTLCache(max_size=100))
+    monkeypatch.setattr(queue_service, "DEDUP_ENABLED", False)
+    # Only a notification can wake a waiter quickly
+    monkeypatch.setattr(queue_service, "QUEUE_POLL_INTERVAL", 10)
+    return queue
+
+
+async def enqueue_later(delay: float, count: int = 1):
+    await asyncio.sleep(delay)
+    for _ in range(count):
+        await asyncio.to_thread(queue_service.enqueue_token_data, TOKEN)
+
+
+def test_poll_returns_empty_after_timeout():
+    queue_service.enqueue_token_data(TOKEN)
+
+    async def main():
+        began = time.perf_counter()
+        response = await alpha_view.poll_tokens(cursor=None, timeout=0.1, limit=None)
+        return response, time.perf_counter() - began
+
+    response, elapsed = asyncio.run(main())
+    assert response.messages == []
+    assert response.next_cursor == 1
+    assert 0.1 <= elapsed < 1
+
+
+def test_poll_wakes_up_on_enqueue():
+    async def main():
+        began = time.perf_counter()
+        writer = asyncio.create_task(enqueue_later(0.05))
+        response = await alpha_view.poll_tokens(cursor=None, timeout=5, limit=None)
+        await writer
+        return response, time.perf_counter() - began
+
+    response, elapsed = asyncio.run(main())
+    assert [message.data["seq"] for message in response.messages] == [0]
+    assert response.next_cursor == 1
+    assert elapsed < 1
+
+
+def test_poll_returns_entries_at_the_cursor_at_once():
+    for _ in range(3):
+        queue_service.enqueue_token_data(TOKEN)
+
+    response = asyncio.run(alpha_view.poll_tokens(cursor=1, timeout=5, limit=1))
+    assert [message.data["seq"] for message in response.messages] == [1]
+    assert response.next_cursor == 2
+
+
+async def read_events(response, count: int) -> list:
+    """Reads `count` SSE events or comments, then closes the stream."""
+    chunks = []
+    stream = response.body_iterator
+    try:
+        async for chunk in stream:
+            chunks.append(chunk)
+            if len(chunks) == count:
+                break
+    finally:
+        await stream.aclose()
+    return chunks
+
+
+def event_ids(chunks: list) -> list:
+    return [int(chunk.split("\n")[0][len("id: ") :]) for chunk in chunks]
+
+
+def test_stream_resumes_after_last_event_id():
+    for _ in range(3):
+        queue_service.enqueue_token_data(TOKEN)
+
+    async def main():
+        response = await alpha_view.stream_tokens(
+            ConnectedRequest(), cursor=None, last_event_id="0"
+        )
+        writer = asyncio.create_task(enqueue_later(0.05))
+        chunks = await asyncio.wait_for(read_events(response, 3), 5)
+        await writer
+        return chunks
+
+    chunks = asyncio.run(main())
+    # 1 and 2 were missed while disconnected, 3 arrives live
+    assert event_ids(chunks) == [1, 2, 3]
+    data = json.loads(chunks[0].split("\n")[2][len("data: ") :])
+    assert data["data"]["seq"] == 1
+    assert data["message"] == queue_service.format_token_message(data["data"])
+
+
+def test_stream_starts_at_new_entries_and_sends_keep_alives(monkeypatch):
+    monkeypatch.setattr(alpha_view, "STREAM_HEARTBEAT_SECONDS", 0.05)
+    queue_service.enqueue_token_data(TOKEN)
+
+    async def main():
+        response = await alpha_view.stream_tokens(
+            ConnectedRequest(), cursor=None, last_event_id=None
+        )
+        stream = response.body_iterator
+        try:
+            chunks = [await stream.__anext__() for _ in range(2)]
+            await enqueue_later(0)
+            chunks.append(await asyncio.wait_for(stream.__anext__(), 5))
+        finally:
+            await stream.aclose()
+        return chunks
+
+    chunks = asyncio.run(main())
+    assert chunks[:2] == [": keep-alive\n\n", ": keep-alive\n\n"]
+    assert event_ids(chunks[2:]) == [1]
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from services.query_service import answer_pipeline
+from services.query_service.answer_pipeline import (
+    AnswerPipeline,
+    UnanswerableQueryError,
+)
+
+RESULTS = {
+    "top gainers today": ("top_gainers", {"period": "day"}, "local"),
+    "when do you launch": ("platform_info", {"type": "launch"}, "llm"),
+    "slow query": ("platform_info", {"type": "general"}, "fallback"),
+    "gibberish": (None, {}, "llm"),
+}
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.calls = []
+
+    async def process_query_with_source(self, query, priority=0):
+        self.calls.append(query)
+        await asyncio.sleep(0.01)
+        return RESULTS[query.lower().strip(" ?")]
+
+
+class FakeEngine:
+    def __init__(self):
+        self.calls = []
+
+    async def process_query(self, intent, params):
+        self.calls.append((intent, params))
+        return f"{intent} {params} #{len(self.calls)}"
+
+
+def make_pipeline():
+    processor, engine = FakeProcessor(), FakeEngine()
+    return AnswerPipeline(processor, engine), processor, engine
+
+
+def test_answer_is_cached_with_its_classification():
+    async def main():
+        pipeline, processor, engine = make_pipeline()
+        first = await pipeline.answer("Top gainers today")
+        # Normalized to the same key: neither classified nor answered again
+        second = await pipeline.answer("top gainers today?")
+        return first, second, processor.calls, engine.calls
+
+    first, second, classified, answered = asyncio.run(main())
+    assert first == {
+        "intent": "top_gainers",
+        "params": {"period": "day"},
+        "message": "top_gainers {'period': 'day'} #1",
+        "fallback": False,
+        "cached": False,
+    }
+    assert second == {**first, "cached": True}
+    assert classified == ["Top gainers today"]
+    assert len(answered) == 1
+
+
+def test_expired_answers_are_rebuilt(monkeypatch):
+    monkeypatch.setattr(answer_pipeline, "ANSWER_CACHE_TTL", 0.05)
+
+    async def main():
+        pipeline, processor, engine = make_pipeline()
+        first = await pipeline.answer("top gainers today")
+        # Fixed responses outlive live data
+        static = await pipeline.answer("when do you launch")
+        await asyncio.sleep(0.1)
+        expired = await pipeline.answer("top gainers today")
+        still_cached = await pipeline.answer("when do you launch")
+        return first, static, expired, still_cached, processor.calls
+
+    first, static, expired, still_cached, classified = asyncio.run(main())
+    assert not expired["cached"]
+    assert expired["message"].endswith("#3")
+    assert still_cached == {**static, "cached": True}
+    assert classified.count("top gainers today") == 2
+
+
+def test_fallback_answers_are_not_cached():
+    async def main():
+        pipeline, processor, _ = make_pipeline()
+        first = await pipeline.answer("slow query")
+        second = await pipeline.answer("slow query")
+        return first, second, processor.calls
+
+    first, second, classified = asyncio.run(main())
+    assert first["fallback"] and second["fallback"]
+    assert not second["cached"]
+    assert len(classified) == 2
+
+
+def test_concurrent_identical_queries_share_one_run():
+    async def main():
+        pipeline, processor, engine = make_pipeline()
+        answers = await asyncio.gather(
+            *(pipeline.answer("top gainers today") for _ in range(5))
+        )
+        return answers, processor.calls, engine.calls
+
+    answers, classified, answered = asyncio.run(main())
+    assert len(classified) == 1 and len(answered) == 1
+    assert len({answer["message"] for answer in answers}) == 1
+
+
+@pytest.mark.parametrize("query", ["gibberish", "  ?! "])
+def test_unclassifiable_queries_raise(query):
+    pipeline, _, _ = make_pipeline()
+    with pytest.raises(UnanswerableQueryError):
+        asyncio.run(pipeline.answer(query))
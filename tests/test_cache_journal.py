@@ -0,0 +1,36 @@
+from utils.cache_journal import CacheJournal
+
+
+def test_compaction_keeps_other_writers_entries(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    first, second = CacheJournal(path), CacheJournal(path)
+
+    first.append("a", 1, 60)
+    second.append("b", 2, 60)
+    first.append("a", 3, 60)
+    first.compact()
+    # Appended after the file was replaced under the second writer's descriptor
+    second.append("c", 4, 60)
+
+    entries = CacheJournal(path).load()
+    assert {key: value for key, (value, _) in entries.items()} == {
+        "a": 3,
+        "b": 2,
+        "c": 4,
+    }
+    first.close()
+    second.close()
+
+
+def test_compaction_keeps_most_recent_entries(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = CacheJournal(path)
+    for key in ["a", "b", "c", "a"]:
+        journal.append(key, key, None)
+    journal.append("expired", 0, -1)
+
+    journal.compact(lambda: [("imported", 5, None)], max_entries=3)
+
+    assert journal.records == 3
+    assert list(CacheJournal(path).load()) == ["c", "a", "imported"]
+    journal.close()
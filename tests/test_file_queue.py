@@ -0,0 +1,172 @@
+import multiprocessing
+import threading
+
+import pytest
+
+from utils.file_queue import FileQueue, Segment
+
+
+def make_queue(tmp_path, **kwargs) -> FileQueue:
+    return FileQueue(str(tmp_path / "queue.jsonl"), fsync_policy="never", **kwargs)
+
+
+def _enqueue(path: str, worker: int, entries: int):
+    queue = FileQueue(path, fsync_policy="never")
+    for i in range(entries):
+        queue.enqueue({"worker": worker, "i": i})
+    queue.close()
+
+
+def test_instances_sharing_a_path_assign_contiguous_seqs(tmp_path):
+    first, second = make_queue(tmp_path), make_queue(tmp_path)
+
+    seqs = []
+    for i in range(20):
+        seqs.append((first if i % 2 else second).enqueue({"i": i}))
+    threads = [
+        threading.Thread(
+            target=lambda queue=queue: [queue.enqueue({"i": -1}) for _ in range(50)]
+        )
+        for queue in (first, second)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seqs == list(range(20))
+    entries = make_queue(tmp_path).dequeue_without_removal()
+    assert [entry["seq"] for entry in entries] == list(range(120))
+    assert [entry["i"] for entry in entries[:20]] == list(range(20))
+
+
+def test_processes_sharing_a_path_lose_no_entries(tmp_path):
+    path = str(tmp_path / "queue.jsonl")
+    FileQueue(path)
+    processes = [
+        multiprocessing.Process(target=_enqueue, args=(path, worker, 200))
+        for worker in range(2)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    entries = FileQueue(path).dequeue_without_removal()
+    assert [entry["seq"] for entry in entries] == list(range(400))
+    assert len({(entry["worker"], entry["i"]) for entry in entries}) == 400
+
+
+def test_unacknowledged_entries_are_delivered_again(tmp_path):
+    queue = make_queue(tmp_path)
+    for i in range(5):
+        queue.enqueue({"i": i})
+
+    entries, cursor = queue.consume("bot", limit=3)
+    assert [entry["i"] for entry in entries] == [0, 1, 2]
+    # Not acknowledged: the same entries come back
+    assert queue.consume("bot", limit=3) == (entries, cursor)
+
+    assert queue.ack("bot", cursor) == 3
+    entries, cursor = queue.consume("bot")
+    assert [entry["i"] for entry in entries] == [3, 4]
+    # Offsets never move backwards
+    assert queue.ack("bot", 1) == 3
+
+
+def test_compaction_waits_for_the_slowest_group(tmp_path):
+    queue = make_queue(tmp_path, segment_max_bytes=200, max_segments=None)
+    queue.consume("fast")
+    queue.consume("slow")
+    for i in range(40):
+        queue.enqueue({"i": i})
+    assert len(queue.segments) > 3
+
+    queue.ack("fast", queue.next_offset)
+    assert queue.segments[0].base_offset == 0
+
+    queue.ack("slow", 20)
+    assert 0 < queue.segments[0].base_offset <= 20
+    entries, _ = queue.consume("slow")
+    assert [entry["seq"] for entry in entries] == list(range(20, 40))
+
+    queue.remove_group("slow")
+    assert len(queue.segments) == 1
+
+
+def test_binary_segments_survive_reopening(tmp_path):
+    queue = make_queue(tmp_path, segment_max_bytes=300, record_format="binary")
+    for i in range(30):
+        queue.enqueue({"i": i, "name": f"token {i}"})
+    written = queue.dequeue_without_removal()
+    queue.close()
+    # A record torn by a crash at the end of the active segment
+    with open(queue.segments[-1].path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+
+    # Reopened without the in-memory tier, so every entry is decoded from disk
+    reopened = make_queue(tmp_path, record_format="binary", recent_capacity=0)
+    assert len(reopened.segments) > 1
+    assert all(segment.binary for segment in reopened.segments)
+    assert reopened.dequeue_without_removal() == written
+    assert reopened.enqueue({"i": 30}) == 30
+
+
+@pytest.mark.parametrize("record_format", ["jsonl", "binary"])
+def test_timestamp_reads_seek_across_segments(tmp_path, record_format):
+    queue = make_queue(
+        tmp_path,
+        segment_max_bytes=400,
+        max_segments=None,
+        index_interval_bytes=100,
+        recent_capacity=0,
+        record_format=record_format,
+    )
+    for i in range(60):
+        queue.enqueue({"i": i})
+    entries = queue.dequeue_without_removal()
+    assert len(entries) == 60
+    assert len(queue.segments) > 3
+
+    for position in (0, 17, 31, 59):
+        timestamp = entries[position]["timestamp"]
+        expected = [entry for entry in entries if entry["timestamp"] > timestamp]
+        assert queue.get_entries_after_timestamp(timestamp) == expected
+    assert queue.get_entries_after_timestamp("2000-01-01T00:00:00+00:00") == entries
+    assert queue.stats()["disk_reads"] > 0
+
+
+@pytest.mark.parametrize("failing", ["write", "flush"])
+def test_failed_commit_writes_nothing(tmp_path, monkeypatch, failing):
+    queue = make_queue(tmp_path, segment_max_bytes=300, max_segments=None)
+    for i in range(3):
+        queue.enqueue({"i": i})
+    before = queue.dequeue_without_removal()
+    segments = len(queue.segments)
+
+    # Fail partway through a batch large enough to roll over to new segments
+    original = getattr(Segment, failing)
+    calls = []
+
+    def fail_later(segment, *args, **kwargs):
+        calls.append(segment)
+        if len(calls) == 8 or failing == "flush":
+            raise OSError("disk full")
+        return original(segment, *args, **kwargs)
+
+    monkeypatch.setattr(Segment, failing, fail_later)
+    with pytest.raises(OSError):
+        queue.enqueue_many([{"i": i} for i in range(3, 13)])
+    monkeypatch.setattr(Segment, failing, original)
+
+    assert queue.dequeue_without_removal() == before
+    assert len(queue.segments) == segments
+    assert queue.enqueue_many([{"i": i} for i in range(3, 13)]) == list(range(3, 13))
+
+    reopened = make_queue(tmp_path, recent_capacity=0, max_segments=None)
+    entries = reopened.dequeue_without_removal()
+    assert [entry["seq"] for entry in entries] == list(range(13))
+    assert [entry["i"] for entry in entries] == list(range(13))
+    assert reopened.get_entries_after_timestamp(entries[5]["timestamp"]) == [
+        entry for entry in entries if entry["timestamp"] > entries[5]["timestamp"]
+    ]
@@ -0,0 +1,49 @@
+import asyncio
+
+from utils.micro_batcher import MicroBatcher
+
+
+def make_batcher(**kwargs):
+    batches = []
+
+    async def handler(items):
+        batches.append(list(items))
+        return [ValueError(item) if item == "bad" else item.upper() for item in items]
+
+    return MicroBatcher(handler, **kwargs), batches
+
+
+def test_full_batch_flushes_without_waiting():
+    async def main():
+        batcher, batches = make_batcher(max_batch_size=3, max_wait=10)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(item) for item in "abc")), 1
+        )
+        return results, batches
+
+    assert asyncio.run(main()) == (["A", "B", "C"], [["a", "b", "c"]])
+
+
+def test_partial_batch_flushes_after_max_wait():
+    async def main():
+        batcher, batches = make_batcher(max_batch_size=10, max_wait=0.05)
+        tasks = [asyncio.create_task(batcher.submit(item)) for item in "ab"]
+        await asyncio.sleep(0.01)
+        assert batches == []
+
+        await asyncio.sleep(0.1)
+        assert batches == [["a", "b"]]
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(main()) == ["A", "B"]
+
+
+def test_item_errors_reach_only_their_caller():
+    async def main():
+        batcher, _ = make_batcher(max_batch_size=2)
+        good, bad = batcher.submit("ok"), batcher.submit("bad")
+        results = await asyncio.gather(good, bad, return_exceptions=True)
+        assert results[0] == "OK"
+        assert isinstance(results[1], ValueError)
+
+    asyncio.run(main())
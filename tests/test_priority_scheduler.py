@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from utils.priority_scheduler import PriorityScheduler, SchedulerOverloaded
+
+
+def test_queued_calls_start_by_priority_then_arrival():
+    async def main():
+        scheduler = PriorityScheduler(max_concurrency=1)
+        release = asyncio.Event()
+        started = []
+
+        def call(name):
+            async def run():
+                started.append(name)
+                if name == "first":
+                    await release.wait()
+                return name
+
+            return run
+
+        tasks = [asyncio.create_task(scheduler.run(call("first"), 0))]
+        await asyncio.sleep(0)
+        for name, priority in [
+            ("bulk", 5),
+            ("urgent", 0),
+            ("normal", 1),
+            ("bulk 2", 5),
+        ]:
+            tasks.append(asyncio.create_task(scheduler.run(call(name), priority)))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 4
+
+        release.set()
+        assert await asyncio.gather(*tasks) == [
+            "first",
+            "bulk",
+            "urgent",
+            "normal",
+            "bulk 2",
+        ]
+        return started
+
+    assert asyncio.run(main()) == ["first", "urgent", "normal", "bulk", "bulk 2"]
+
+
+def test_deadline_covers_queue_wait_and_run():
+    async def main():
+        scheduler = PriorityScheduler(max_concurrency=1, timeout=0.05)
+        blocker = asyncio.create_task(scheduler.run(lambda: asyncio.sleep(1)))
+        await asyncio.sleep(0)
+        # Times out while still waiting for the slot
+        with pytest.raises(asyncio.TimeoutError):
+            await scheduler.run(lambda: asyncio.sleep(0), timeout=0.01)
+        # Times out while running
+        with pytest.raises(asyncio.TimeoutError):
+            await blocker
+        assert await scheduler.run(lambda: asyncio.sleep(0, "done")) == "done"
+        return scheduler.stats()
+
+    stats = asyncio.run(main())
+    assert stats["timeouts"] == 2
+    assert stats["completed"] == 1
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def test_full_queue_rejects_new_calls():
+    async def main():
+        scheduler = PriorityScheduler(max_concurrency=1, max_queue=2)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(scheduler.run(release.wait)) for _ in range(3)]
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerOverloaded):
+            await scheduler.run(release.wait)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        return scheduler.stats()
+
+    stats = asyncio.run(main())
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 3
@@ -0,0 +1,49 @@
+import pytest
+
+from services.query_service.semantic_cache import SemanticCache
+
+CACHED = [
+    ("when did ansem call wif", ("stupid_question", {"coinSymbol": "wif"})),
+    ("best call for pepe this week", ("best_call", {"coinSymbol": "pepe"})),
+    (
+        "what is the best call of ansem",
+        ("best_call", {"influencerTwitterUserName": "ansem"}),
+    ),
+    ("who are the best kols", ("top_kols", {"period": "week"})),
+]
+
+
+@pytest.fixture
+def cache() -> SemanticCache:
+    cache = SemanticCache(threshold=0.75, max_size=100)
+    for question, result in CACHED:
+        cache.add(question, result)
+    return cache
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "when did ansem call bonk",
+        "best call for wif this week",
+        "what is the best call of cobie",
+    ],
+)
+def test_different_names_never_share_a_result(cache, question):
+    assert cache.get(question) is None
+    # The relaxed threshold used for fallback answers applies the same guard
+    assert cache.get(question, threshold=0.5) is None
+
+
+def test_paraphrases_share_a_result(cache):
+    assert cache.get("who are the top kols") == ("top_kols", {"period": "week"})
+    assert cache.get("what was the best call for pepe this week") == (
+        "best_call",
+        {"coinSymbol": "pepe"},
+    )
+
+
+def test_echoed_question_is_rewritten(cache):
+    intent, params = cache.get("when did ansem call wif?")
+    assert intent == "stupid_question"
+    assert params == {"coinSymbol": "wif", "question": "when did ansem call wif?"}
@@ -0,0 +1,104 @@
+from services.alpha_view.token_index import TokenIndex
+from utils.file_queue import FileQueue
+
+CHAINS = [("solana", "Solana"), ("1", "Ethereum"), ("8453", "Base")]
+
+
+def make_queue(tmp_path, **kwargs) -> FileQueue:
+    return FileQueue(str(tmp_path / "queue.jsonl"), fsync_policy="never", **kwargs)
+
+
+def enqueue_tokens(queue: FileQueue, start: int, count: int):
+    for i in range(start, start + count):
+        chain, chain_name = CHAINS[i % len(CHAINS)]
+        queue.enqueue(
+            {
+                "chain": chain,
+                "chainName": chain_name,
+                "tokenAddress": f"token{i}",
+                "amount": i % 7,
+                "fdv": float(i * 1000),
+            }
+        )
+
+
+def matching(entries, chain=None, min_fdv=None, max_fdv=None, min_amount=None):
+    return [
+        entry
+        for entry in entries
+        if (
+            chain is None
+            or chain.lower() in (entry["chain"], entry["chainName"].lower())
+        )
+        and (min_fdv is None or entry["fdv"] >= min_fdv)
+        and (max_fdv is None or entry["fdv"] <= max_fdv)
+        and (min_amount is None or entry["amount"] >= min_amount)
+    ]
+
+
+def test_query_matches_a_full_scan(tmp_path):
+    queue = make_queue(tmp_path)
+    enqueue_tokens(queue, 0, 60)
+    index = TokenIndex(queue)
+    entries = queue.dequeue_without_removal()
+
+    for filters in [
+        {},
+        {"chain": "ETHEREUM"},
+        {"chain": "8453", "min_amount": 3},
+        {"min_fdv": 10000, "max_fdv": 25000},
+        {"chain": "solana", "min_fdv": 30000, "min_amount": 5},
+    ]:
+        expected = matching(entries, **filters)
+        assert index.query(**filters) == (expected, len(expected))
+
+    page, total = index.query(chain="base", offset=5, limit=4)
+    assert page == matching(entries, chain="base")[5:9]
+    assert total == 20
+
+
+def test_refresh_indexes_entries_from_other_writers(tmp_path):
+    queue = make_queue(tmp_path)
+    index = TokenIndex(queue)
+    enqueue_tokens(queue, 0, 5)
+    assert index.query()[1] == 5
+
+    # Written through another instance, as another worker process would
+    enqueue_tokens(make_queue(tmp_path), 5, 5)
+    entries, total = index.query(chain="solana")
+    assert total == 4
+    assert [entry["seq"] for entry in entries] == [0, 3, 6, 9]
+
+
+def test_entries_dropped_by_retention_are_evicted(tmp_path):
+    queue = make_queue(tmp_path, segment_max_bytes=1000, max_segments=3)
+    index = TokenIndex(queue)
+    enqueue_tokens(queue, 0, 10)
+    assert index.query()[1] == 10
+
+    enqueue_tokens(queue, 10, 50)
+    start = queue.log_start
+    assert start > 10
+    retained = queue.dequeue_without_removal()
+    assert retained[0]["seq"] == start
+
+    entries, total = index.query(min_fdv=0)
+    assert entries == retained and total == len(retained)
+    assert min(index.entries) == start
+    assert all(seq >= start for seqs in index.by_chain.values() for seq in seqs)
+    assert all(seq >= start for _, seq in index.by_fdv + index.by_amount)
+    assert index.stats()["indexed_entries"] == len(retained)
+
+
+def test_dequeue_all_empties_the_index(tmp_path):
+    queue = make_queue(tmp_path)
+    index = TokenIndex(queue)
+    enqueue_tokens(queue, 0, 6)
+    assert index.query(chain="solana")[1] == 2
+
+    queue.dequeue_all()
+    assert index.query() == ([], 0)
+    assert index.by_chain == {} and index.by_fdv == [] and index.by_amount == []
+
+    enqueue_tokens(queue, 6, 3)
+    assert [entry["seq"] for entry in index.query()[0]] == [6, 7, 8]
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+from typing import Optional, Set, Tuple
+
+
+class AsyncNotifier:
+    """
+    Wakes asyncio waiters when new data is available.
+
+    `notify()` may be called from any thread (e.g. a sync FastAPI route running
+    in the threadpool). Waiters pass the `version` they observed before checking
+    for data, so a notification that lands between the check and the wait is
+    never lost.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+        self._lock = threading.Lock()
+
+    def notify(self):
+        with self._lock:
+            self.version += 1
+            waiters = list(self._waiters)
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(self._wake, future)
+
+    @staticmethod
+    def _wake(future: asyncio.Future):
+        if not future.done():
+            future.set_result(None)
+
+    async def wait(self, version: int, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the version moves past `version`.
+
+        Returns:
+            bool: True if notified, False if the timeout expired first
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (loop, future)
+        with self._lock:
+            if self.version != version:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from utils.file_lock import FileLock
+
+
+class CacheJournal:
+    """
+    Append-only persistence for a key-value cache, shared by worker processes.
+
+    Every write appends one JSON line {"k": key, "v": value, "e": expiry} with a
+    single `os.write` on an O_APPEND descriptor. Loads, appends and compactions
+    hold an exclusive flock on `<path>.lock`, so they never overlap across
+    processes. On load the last record of each key wins, records past their
+    wall-clock expiry are skipped and a torn trailing line is truncated.
+
+    `compact` rewrites the journal from the merged on-disk records of every
+    process, not from this process's cache, and swaps it in atomically. Each
+    process reopens its descriptor when the file it appends to was replaced,
+    so appends made after another process compacted are not lost.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._file_lock: Optional[FileLock] = None
+        # Records in the journal file, live or superseded
+        self.records = 0
+        # Live entries after the last load or compaction
+        self.live = 0
+
+    @contextmanager
+    def _locked(self):
+        """Holds the thread lock and the cross-process flock."""
+        with self.lock:
+            if self._file_lock is None:
+                self._file_lock = FileLock(f"{self.path}.lock")
+            with self._file_lock.acquire():
+                yield
+
+    def _read(self) -> Tuple[Dict[str, Tuple[Any, Optional[float]]], int]:
+        """
+        Reads every record; call it with the lock held.
+
+        Returns:
+            Tuple[Dict[str, Tuple[Any, Optional[float]]], int]: key -> (value,
+            wall-clock expiry or None), ordered from least to most recently
+            written, and the number of records in the file
+        """
+        entries = {}
+        records = 0
+        try:
+            with open(self.path, "rb+") as f:
+                complete = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Cut a record torn by a crash, so the next append starts a new line
+                        f.truncate(complete)
+                        break
+                    complete += len(line)
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Corrupt line
+                    records += 1
+                    entries.pop(record["k"], None)
+                    entries[record["k"]] = (record["v"], record.get("e"))
+        except FileNotFoundError:
+            pass
+        return entries, records
+
+    def load(self) -> Dict[str, Tuple[Any, Optional[float]]]:
+        """
+        Reads the journal.
+
+        Returns:
+            Dict[str, Tuple[Any, Optional[float]]]: key -> (value, seconds until
+            expiry or None if it never expires)
+        """
+        with self._locked():
+            entries, records = self._read()
+            now = time.time()
+            live = {
+                key: (value, expires_at - now if expires_at is not None else None)
+                for key, (value, expires_at) in entries.items()
+                if expires_at is None or expires_at > now
+            }
+            self.records = records
+            self.live = len(live)
+        return live
+
+    @staticmethod
+    def _record(key: str, value: Any, expires_at: Optional[float]) -> bytes:
+        return (json.dumps({"k": key, "v": value, "e": expires_at}) + "\n").encode(
+            "utf-8"
+        )
+
+    def _replaced(self) -> bool:
+        """Whether the open descriptor no longer points at the journal file."""
+        try:
+            return os.fstat(self._fd).st_ino != os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return True
+
+    def append(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Appends one entry; O(1) regardless of the journal size."""
+        expires_at = time.time() + ttl if ttl is not None else None
+        record = self._record(key, value, expires_at)
+        with self._locked():
+            if self._fd is not None and self._replaced():
+                # Another process compacted the journal; append to the new file
+                os.close(self._fd)
+                self._fd = None
+            if self._fd is None:
+                self._fd = os.open(
+                    self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+                )
+            os.write(self._fd, record)
+            self.records += 1
+
+    def compact(
+        self,
+        snapshot: Optional[
+            Callable[[], Iterable[Tuple[str, Any, Optional[float]]]]
+        ] = None,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Replaces the journal with one record per live entry.
+
+        The entries are read back from the journal file, so records appended by
+        other processes are kept. Entries of `snapshot` missing from the file
+        (e.g. imported from elsewhere) are added.
+
+        Args:
+            snapshot: Returns (key, value, seconds until expiry or None) of
+                entries to keep in addition to those on disk
+            max_entries (int, optional): Keeps only the most recently written
+                entries, like the bounded cache loading the journal would
+        """
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with self._locked():
+            entries, _ = self._read()
+            now = time.time()
+            for key, value, ttl in snapshot() if snapshot is not None else ():
+                if key not in entries:
+                    entries[key] = (value, now + ttl if ttl is not None else None)
+
+            live = [
+                (key, value, expires_at)
+                for key, (value, expires_at) in entries.items()
+                if expires_at is None or expires_at > now
+            ]
+            if max_entries is not None:
+                live = live[-max_entries:] if max_entries > 0 else []
+
+            with open(temp_path, "wb") as f:
+                for key, value, expires_at in live:
+                    f.write(self._record(key, value, expires_at))
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(temp_path, self.path)
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self.records = len(live)
+            self.live = len(live)
+
+    def close(self):
+        with self.lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            if self._file_lock is not None:
+                self._file_lock.close()
+                self._file_lock = None
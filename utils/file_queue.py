@@ -1,62 +1,1164 @@
 import json
-from datetime import datetime, timezone
-from typing import Dict, List
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_right
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
 import threading
+from utils.file_lock import FileLock
+
+SEGMENT_SUFFIX = ".jsonl"
+BINARY_SEGMENT_SUFFIX = ".bin"
+INDEX_SUFFIX = ".index"
+LOCK_FILE = ".lock"
+OFFSETS_FILE = "consumers.json"
+
+# Byte pattern of the top-level timestamp key in JSONL records
+TIMESTAMP_KEY = b'"timestamp": "'
+
+# Record formats: one JSON object per line, or a fixed binary header
+# (timestamp in microseconds, seq, payload length) followed by compact JSON
+# without the seq
+RECORD_FORMATS = ("jsonl", "binary")
+RECORD_HEADER = struct.Struct("<qqI")
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def timestamp_to_us(timestamp: str) -> Optional[int]:
+    """Microseconds since the epoch for an ISO timestamp (UTC if naive), or None."""
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - EPOCH) // MICROSECOND
+
+
+def us_to_timestamp(us: int) -> str:
+    return (EPOCH + us * MICROSECOND).isoformat()
+
+
+class Segment:
+    """
+    One append-only file of the queue log plus its sparse index.
+
+    Segments are named after the offset of their first record. The index maps
+    (record offset, byte position, timestamp) every `index_interval_bytes`, so
+    readers can seek close to a timestamp instead of parsing the whole file.
+
+    The record format is per segment and shown by the file suffix: `.jsonl`
+    or `.bin`. Binary records start with a fixed header holding the timestamp,
+    so timestamp filters skip older records without decoding their payload.
+    """
+
+    def __init__(self, directory: str, base_offset: int, record_format: str = "jsonl"):
+        self.base_offset = base_offset
+        self.record_format = record_format
+        self.binary = record_format == "binary"
+        name = f"{base_offset:020d}"
+        suffix = BINARY_SEGMENT_SUFFIX if self.binary else SEGMENT_SUFFIX
+        self.path = os.path.join(directory, name + suffix)
+        self.index_path = os.path.join(directory, name + INDEX_SUFFIX)
+        self.index: List[Tuple[int, int, str]] = []
+        self.index_offsets: List[int] = []
+        self.index_timestamps: List[str] = []
+        self.size = 0
+        self.next_offset = base_offset
+        self.last_timestamp: Optional[str] = None
+        self.last_modified = time.time()
+        self.handle = None
+
+    @property
+    def record_count(self) -> int:
+        return self.next_offset - self.base_offset
+
+    def load_index_entry(self, offset: int, position: int, timestamp: str):
+        self.index.append((offset, position, timestamp))
+        self.index_offsets.append(offset)
+        self.index_timestamps.append(timestamp)
+
+    def add_index_entry(self, offset: int, position: int, timestamp: str):
+        self.load_index_entry(offset, position, timestamp)
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(f"{offset} {position} {timestamp}\n")
+
+    def clear_index(self):
+        self.index, self.index_offsets, self.index_timestamps = [], [], []
+
+    def _seek(self, i: int) -> Tuple[int, int]:
+        if i < 0:
+            return self.base_offset, 0
+        offset, position, _ = self.index[i]
+        return offset, position
+
+    def seek_timestamp(self, timestamp: str) -> Tuple[int, int]:
+        """(offset, byte position) of the last indexed record at or before `timestamp`."""
+        return self._seek(bisect_right(self.index_timestamps, timestamp) - 1)
+
+    def seek_offset(self, offset: int) -> Tuple[int, int]:
+        """(offset, byte position) of the last indexed record at or before `offset`."""
+        return self._seek(bisect_right(self.index_offsets, offset) - 1)
+
+    def encode(self, entry: Dict) -> bytes:
+        """Serializes an entry stamped with "timestamp" and "seq" as one record."""
+        if not self.binary:
+            return (json.dumps(entry) + "\n").encode("utf-8")
+        payload = json.dumps(
+            {k: v for k, v in entry.items() if k != "seq"}, separators=(",", ":")
+        ).encode("utf-8")
+        header = RECORD_HEADER.pack(
+            timestamp_to_us(entry["timestamp"]), entry["seq"], len(payload)
+        )
+        return header + payload
+
+    def scan(self, position: int = 0) -> Iterator[Tuple[int, int, Optional[str]]]:
+        """
+        Yields (position, length, timestamp) of each complete record from
+        `position` on, stopping at a partial record still being written.
+        Blank JSONL lines are yielded with a None timestamp.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(position)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        if not self.binary:
+            for line in data.splitlines(keepends=True):
+                if not line.endswith(b"\n"):
+                    return
+                timestamp = None
+                if line.strip():
+                    timestamp = json.loads(line).get("timestamp", "")
+                yield position, len(line), timestamp
+                position += len(line)
+            return
+
+        start, end = 0, len(data)
+        while start + RECORD_HEADER.size <= end:
+            timestamp_us, _, length = RECORD_HEADER.unpack_from(data, start)
+            size = RECORD_HEADER.size + length
+            if start + size > end:
+                return
+            yield position + start, size, us_to_timestamp(timestamp_us)
+            start += size
+
+    def read(
+        self, offset: int = None, position: int = 0, after: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """
+        Yields the entries stored from `position` to the end of the segment.
+        `offset` is the offset of the record at `position`; it is used to number
+        entries written before sequence numbers were stored.
+
+        With `after`, only entries with a later timestamp are yielded; binary
+        records that are not newer are skipped without decoding.
+        """
+        if offset is None:
+            offset = self.base_offset
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(position)
+                if self.binary:
+                    yield from self._read_binary(f.read(), after)
+                    return
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entry.setdefault("seq", offset)
+                        offset += 1
+                        if after is None or entry.get("timestamp", "") > after:
+                            yield entry
+        except FileNotFoundError:
+            return
+
+    @staticmethod
+    def _read_binary(
+        data: bytes, after: Optional[str], start: int = 0, end: Optional[int] = None
+    ) -> Iterator[Dict]:
+        after_us = timestamp_to_us(after) if after is not None else None
+        end = len(data) if end is None else end
+        while start + RECORD_HEADER.size <= end:
+            timestamp_us, seq, length = RECORD_HEADER.unpack_from(data, start)
+            payload_start = start + RECORD_HEADER.size
+            start = payload_start + length
+            if start > end:
+                return  # Partial record still being written
+            if after_us is not None and timestamp_us <= after_us:
+                continue
+            entry = json.loads(data[payload_start:start])
+            if after_us is None and after is not None:
+                # Not an ISO timestamp: compare as strings, like JSONL segments
+                if entry.get("timestamp", "") <= after:
+                    continue
+            entry["seq"] = seq
+            yield entry
+
+    def read_after_timestamp(self, timestamp: str) -> List[Dict]:
+        """
+        Returns the entries newer than `timestamp` through a read-only memory map.
+
+        The sparse index narrows the search to the records between two index
+        entries; the first newer record is then found by binary search on
+        record boundaries (JSONL) or by walking the fixed headers (binary),
+        reading only timestamps. Just the matching tail is decoded.
+        """
+        i = bisect_right(self.index_timestamps, timestamp)
+        offset, low = self._seek(i - 1)
+        high = self.index[i][1] if i < len(self.index) else self.size
+        if low >= self.size:
+            return []
+
+        with open(self.path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                end = min(self.size, len(data))
+                if self.binary:
+                    return list(self._read_binary(data, timestamp, low, end))
+
+                first = self._bisect_lines(data, low, min(high, end), timestamp)
+                entries = []
+                start = first
+                while start < end:
+                    newline = data.find(b"\n", start, end)
+                    if newline < 0:
+                        break
+                    line = data[start : newline + 1]
+                    if line.strip():
+                        entries.append(json.loads(line))
+                    start = newline + 1
+
+                if entries and "seq" not in entries[0]:
+                    # Records written before sequence numbers: number them by
+                    # counting the records skipped since the index entry
+                    offset += sum(
+                        1 for line in data[low:first].split(b"\n") if line.strip()
+                    )
+                    for entry in entries:
+                        entry.setdefault("seq", offset)
+                        offset += 1
+                return entries
+
+    @staticmethod
+    def _line_timestamp(data, start: int, end: int) -> str:
+        key = data.rfind(TIMESTAMP_KEY, start, end)
+        if key < 0:
+            line = data[start:end]
+            return json.loads(line).get("timestamp", "") if line.strip() else ""
+        key += len(TIMESTAMP_KEY)
+        return data[key : data.find(b'"', key, end)].decode("utf-8")
+
+    @classmethod
+    def _bisect_lines(cls, data, low: int, high: int, timestamp: str) -> int:
+        """
+        Position of the first JSONL record in [low, high) newer than `timestamp`,
+        or `high`. Both bounds must be record boundaries.
+        """
+        while low < high:
+            middle = (low + high) // 2
+            start = data.rfind(b"\n", low, middle) + 1 or low
+            end = data.find(b"\n", start, high) + 1 or high
+            if cls._line_timestamp(data, start, end) <= timestamp:
+                low = end
+            else:
+                high = start
+        return low
+
+    def truncate_partial_record(self):
+        """Drops a trailing record left incomplete by an interrupted write."""
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            if not self.binary:
+                f.seek(size - 1)
+                if f.read(1) == b"\n":
+                    return
+                f.seek(0)
+                f.truncate(f.read().rfind(b"\n") + 1)
+                return
+
+            f.seek(0)
+            data = f.read()
+            end = 0
+            while end + RECORD_HEADER.size <= size:
+                length = RECORD_HEADER.size + RECORD_HEADER.unpack_from(data, end)[2]
+                if end + length > size:
+                    break
+                end += length
+            if end != size:
+                f.truncate(end)
+
+    def write(self, data: bytes):
+        """Buffers bytes on the segment's long-lived append handle."""
+        if self.handle is None:
+            self.handle = open(self.path, "ab")
+        self.handle.write(data)
+
+    def flush(self, fsync: bool = False):
+        if self.handle is None:
+            return
+        self.handle.flush()
+        if fsync:
+            os.fsync(self.handle.fileno())
+
+    def close(self, fsync: bool = False):
+        if self.handle is None:
+            return
+        self.flush(fsync)
+        self.handle.close()
+        self.handle = None
+
+    def discard(self):
+        """Closes the handle, ignoring a failure to flush what it still buffers."""
+        if self.handle is None:
+            return
+        try:
+            self.handle.close()
+        except OSError:
+            pass
+        self.handle = None
+
+    def rollback(self, size: int, next_offset: int, index_entries: int):
+        """
+        Cuts the segment back to an earlier size after a failed commit.
+
+        Args:
+            size (int): Byte size to truncate the file to
+            next_offset (int): Offset of the first record cut
+            index_entries (int): Index entries to keep
+        """
+        self.discard()
+        with open(self.path, "ab") as f:
+            f.truncate(size)
+        if len(self.index) > index_entries:
+            kept = self.index[:index_entries]
+            self.clear_index()
+            for entry in kept:
+                self.load_index_entry(*entry)
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                f.writelines(
+                    f"{offset} {position} {timestamp}\n"
+                    for offset, position, timestamp in kept
+                )
+        self.size = size
+        self.next_offset = next_offset
+        self.last_modified = time.time()
+
+    def delete(self):
+        self.close()
+        for path in (self.path, self.index_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class _PendingWrite:
+    """Entries waiting for the next group commit, and the outcome of that commit."""
+
+    def __init__(self, entries: List[Dict]):
+        self.entries = entries
+        self.seqs: Optional[List[int]] = None
+        self.error: Optional[Exception] = None
 
 
 class FileQueue:
-    """Handles enqueue and dequeue operations to a file-based queue."""
+    """
+    Handles enqueue and dequeue operations to a file-based queue.
+
+    Entries are stored in a segmented append-only log in a directory next to
+    `path` (e.g. `alpha_queue.jsonl` -> `alpha_queue/`). Segments roll over at
+    `segment_max_bytes`; the oldest are removed once there are more than
+    `max_segments` or once they are older than `retention_seconds`.
+
+    The most recent `recent_capacity` entries are also kept parsed in an
+    in-memory ring buffer, warmed from the log tail at startup, so reads of the
+    recent window never touch the disk.
 
-    def __init__(self, path: str):
+    Writes use group commit: while one thread writes a batch through the open
+    segment handle, concurrent enqueues queue up and are written together by
+    the next commit. `fsync_policy` is "always" (fsync every commit),
+    "interval" (at most every `fsync_interval` seconds) or "never".
+
+    With `multiprocess` enabled, every operation also takes a lock file in the
+    log directory (shared for reads, exclusive for writes) and first catches up
+    with segments written, rolled or removed by other processes, so several
+    workers can share one queue without interleaving or losing entries.
+
+    New segments use `record_format`: "jsonl" or the compact "binary" layout
+    whose timestamp header lets timestamp reads skip records undecoded.
+    Existing segments keep their format until `convert_segments` rewrites them.
+
+    Consumers never truncate the log. Each consumer group reads from its own
+    committed offset and acknowledges what it has processed with `ack`;
+    `dequeue_all` only moves the start of the log seen by plain readers. Both
+    are kept in `consumers.json`, replaced atomically, and closed segments
+    are compacted once every group (or, without groups, the log start) has
+    moved past them. The retention limits above still apply as a hard cap.
+    """
+
+    THROUGHPUT_WINDOW_SECONDS = 60
+
+    def __init__(
+        self,
+        path: str,
+        segment_max_bytes: int = 4 * 1024 * 1024,
+        index_interval_bytes: int = 4096,
+        max_segments: Optional[int] = 8,
+        retention_seconds: Optional[float] = None,
+        fsync_policy: str = "interval",
+        fsync_interval: float = 1.0,
+        recent_capacity: int = 10000,
+        multiprocess: bool = True,
+        record_format: str = "jsonl",
+    ):
+        if fsync_policy not in ("always", "interval", "never"):
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        if record_format not in RECORD_FORMATS:
+            raise ValueError(f"Unknown record format: {record_format}")
         self.path = path
+        self.directory = os.path.splitext(path)[0]
+        self.segment_max_bytes = segment_max_bytes
+        self.index_interval_bytes = index_interval_bytes
+        self.max_segments = max_segments
+        self.retention_seconds = retention_seconds
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.record_format = record_format
         self.lock = threading.Lock()
+        self.segments: List[Segment] = []
+
+        # Group commit state
+        self._commit_cond = threading.Condition()
+        self._pending: List[_PendingWrite] = []
+        self._committing = False
+        self._last_fsync = time.monotonic()
+
+        # In-memory tier of the most recent entries, contiguous by seq
+        self.recent = deque(maxlen=recent_capacity)
+        self._memory_reads = 0
+        self._disk_reads = 0
+
+        # Consumer offsets, persisted in OFFSETS_FILE
+        self.offsets_path = os.path.join(self.directory, OFFSETS_FILE)
+        self.start_offset = 0
+        self.group_offsets: Dict[str, int] = {}
+        self._offsets_stamp = None
+
+        # Throughput counters
+        self._started = time.monotonic()
+        self._enqueued = 0
+        self._commits = 0
+        self._recent_commits = deque()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.file_lock = (
+            FileLock(os.path.join(self.directory, LOCK_FILE)) if multiprocess else None
+        )
+        with self._locked(sync=False):
+            self._migrate_legacy_file()
+            self._load_segments()
+            self._load_offsets()
+            self._warm_recent()
+
+    @contextmanager
+    def _locked(self, shared: bool = False, sync: bool = True):
+        """
+        Holds the thread lock and, in multiprocess mode, the cross-process file
+        lock, catching up with changes made by other processes first.
+        """
+        with self.lock:
+            if self.file_lock is None:
+                yield
+                return
+            with self.file_lock.acquire(shared=shared):
+                if sync:
+                    self._sync_from_disk()
+                yield
+
+    def _sync_from_disk(self):
+        """Refreshes in-memory state with segments changed by other processes."""
+        self._load_offsets()
+        formats = self._segment_formats()
+        known = {
+            segment.base_offset: segment.record_format for segment in self.segments
+        }
+        active = self.segments[-1]
+        if formats == known:
+            try:
+                size = os.path.getsize(active.path)
+            except FileNotFoundError:
+                size = 0
+            if size == active.size:
+                return
+
+        previous_next_offset = self.next_offset
+        by_offset = {segment.base_offset: segment for segment in self.segments}
+        segments = []
+        for base_offset in sorted(formats):
+            segment = by_offset.pop(base_offset, None)
+            if segment is not None and segment.record_format != formats[base_offset]:
+                segment.close()  # Converted by convert_segments
+                segment = None
+            if segment is None:
+                segment = self._recover_segment(
+                    base_offset, formats[base_offset], repair=False
+                )
+            elif os.path.getsize(segment.path) != segment.size:
+                self._scan_tail(segment, segment.next_offset, segment.size, False)
+            segments.append(segment)
+
+        # Segments removed by retention or dequeue_all in another process, and
+        # segments another process has rolled past, are no longer written here
+        for segment in list(by_offset.values()) + segments[:-1]:
+            segment.close()
+
+        self.segments = segments or [
+            Segment(self.directory, previous_next_offset, self.record_format)
+        ]
+
+        # Keep the ring buffer contiguous and within the retained log
+        if self.recent.maxlen:
+            if self.next_offset > previous_next_offset:
+                start = max(previous_next_offset, self.segments[0].base_offset)
+                self.recent.extend(self._read_after_offset_from_disk(start)[0])
+            first = self.segments[0].base_offset
+            while self.recent and self.recent[0]["seq"] < first:
+                self.recent.popleft()
+
+    def _migrate_legacy_file(self):
+        """Moves a pre-segmentation queue file into the log as its first segment."""
+        if not os.path.isfile(self.path) or self._segment_offsets():
+            return
+        os.replace(self.path, Segment(self.directory, 0).path)
+
+    def _load_offsets(self):
+        """Reloads consumer offsets if the offsets file changed since last read."""
+        try:
+            stat = os.stat(self.offsets_path)
+        except FileNotFoundError:
+            return
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if stamp == self._offsets_stamp:
+            return
+        with open(self.offsets_path, "r", encoding="utf-8") as f:
+            offsets = json.load(f)
+        self.start_offset = offsets.get("start_offset", 0)
+        self.group_offsets = offsets.get("groups", {})
+        self._offsets_stamp = stamp
+
+    def _save_offsets(self):
+        """Atomically replaces the offsets file. Caller holds the exclusive lock."""
+        temp_path = f"{self.offsets_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"start_offset": self.start_offset, "groups": self.group_offsets}, f
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.offsets_path)
+        stat = os.stat(self.offsets_path)
+        self._offsets_stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _segment_formats(self) -> Dict[int, str]:
+        """Record format of each segment in the directory, keyed by base offset."""
+        formats = {}
+        for name in os.listdir(self.directory):
+            if name.endswith(SEGMENT_SUFFIX):
+                formats.setdefault(int(name[: -len(SEGMENT_SUFFIX)]), "jsonl")
+            elif name.endswith(BINARY_SEGMENT_SUFFIX):
+                # A converted segment wins over a leftover JSONL copy
+                formats[int(name[: -len(BINARY_SEGMENT_SUFFIX)])] = "binary"
+        return formats
+
+    def _segment_offsets(self) -> List[int]:
+        return sorted(self._segment_formats())
+
+    def _new_segment(self, base_offset: int) -> Segment:
+        """Creates an empty segment file in the configured record format."""
+        segment = Segment(self.directory, base_offset, self.record_format)
+        open(segment.path, "a", encoding="utf-8").close()
+        return segment
+
+    def _load_segments(self):
+        formats = self._segment_formats()
+        self.segments = [self._recover_segment(o, formats[o]) for o in sorted(formats)]
+        if not self.segments:
+            self.segments.append(self._new_segment(0))
+
+    def _recover_segment(
+        self, base_offset: int, record_format: str, repair: bool = True
+    ) -> Segment:
+        """
+        Rebuilds a segment's in-memory state from its files. The index is loaded
+        (or regenerated if missing) and only the tail after the last index entry
+        is scanned to find the record count and last timestamp.
+
+        With `repair`, a torn trailing record is truncated and regenerated index
+        entries are persisted; that requires the exclusive lock.
+        """
+        segment = Segment(self.directory, base_offset, record_format)
+        if repair:
+            segment.truncate_partial_record()
+        segment.size = os.path.getsize(segment.path)
+        segment.last_modified = os.path.getmtime(segment.path)
+
+        index_valid = True
+        try:
+            with open(segment.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    offset, position, timestamp = line.split()
+                    if int(position) >= segment.size:
+                        index_valid = False
+                        break
+                    segment.load_index_entry(int(offset), int(position), timestamp)
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            index_valid = False
 
-    def enqueue(self, data: Dict):
+        if not index_valid:
+            # Regenerate the index from scratch rather than trusting a torn file
+            segment.clear_index()
+            if repair:
+                os.remove(segment.index_path)
+
+        if segment.index:
+            offset, position, _ = segment.index[-1]
+        else:
+            offset, position = base_offset, 0
+
+        self._scan_tail(segment, offset, position, persist_index=repair)
+        return segment
+
+    def _scan_tail(
+        self, segment: Segment, offset: int, position: int, persist_index: bool
+    ):
+        """
+        Scans complete records from `position` (the record numbered `offset`) to
+        the end of the segment, adding index entries with the same spacing rule
+        as `_append` and updating the segment's size, count and last timestamp.
+        """
+        last_indexed = segment.index[-1][1] if segment.index else None
+        for position, length, timestamp in segment.scan(position):
+            if timestamp is not None:
+                if last_indexed is None or (
+                    position - last_indexed >= self.index_interval_bytes
+                ):
+                    if persist_index:
+                        segment.add_index_entry(offset, position, timestamp)
+                    else:
+                        segment.load_index_entry(offset, position, timestamp)
+                    last_indexed = position
+                segment.last_timestamp = timestamp
+                offset += 1
+            position += length
+
+        segment.size = position
+        segment.next_offset = offset
+
+    def _warm_recent(self):
+        """Fills the ring buffer from the tail of the log."""
+        self.recent.clear()
+        if self.recent.maxlen:
+            start = max(self.next_offset - self.recent.maxlen, 0)
+            self.recent.extend(self._read_after_offset_from_disk(start)[0])
+
+    @property
+    def next_offset(self) -> int:
+        return self.segments[-1].next_offset
+
+    @property
+    def log_start(self) -> int:
+        """First offset visible to plain readers, after `dequeue_all` and retention."""
+        return max(self.segments[0].base_offset, self.start_offset)
+
+    def head(self) -> Tuple[int, int]:
+        """(first, next) offsets of the retained log; changes whenever reads could."""
+        with self._locked(shared=True):
+            return self.log_start, self.next_offset
+
+    def _active_segment(self) -> Segment:
+        segment = self.segments[-1]
+        if segment.size >= self.segment_max_bytes:
+            segment.close(fsync=self.fsync_policy != "never")
+            segment = self._new_segment(segment.next_offset)
+            self.segments.append(segment)
+            self._apply_retention()
+        return segment
+
+    def _apply_retention(self):
+        """Deletes the oldest closed segments beyond the configured limits."""
+        now = time.time()
+        while len(self.segments) > 1:
+            oldest = self.segments[0]
+            too_many = self.max_segments and len(self.segments) > self.max_segments
+            too_old = (
+                self.retention_seconds is not None
+                and now - oldest.last_modified > self.retention_seconds
+            )
+            if not (too_many or too_old):
+                break
+            oldest.delete()
+            self.segments.pop(0)
+
+    def _compact(self):
+        """
+        Deletes closed segments every consumer has moved past: below the lowest
+        group offset, or below the log start when no group is registered.
+        """
+        if self.group_offsets:
+            acknowledged = min(self.group_offsets.values())
+        else:
+            acknowledged = self.start_offset
+        while len(self.segments) > 1 and self.segments[1].base_offset <= acknowledged:
+            self.segments.pop(0).delete()
+
+    def enqueue(self, data: Dict) -> int:
+        """
+        Appends an entry, stamping it with the current time and a monotonically
+        increasing sequence number (its offset in the log).
+
+        Returns:
+            int: The sequence number assigned to the entry
+        """
+        return self.enqueue_many([data])[0]
+
+    def enqueue_many(self, entries: List[Dict]) -> List[int]:
+        """
+        Appends several entries in order through the group commit writer.
+
+        The calling thread either becomes the committer, writing its entries
+        together with everything queued by other threads in one flush, or waits
+        for the in-progress commit to pick its entries up.
+
+        Returns:
+            List[int]: The sequence numbers assigned to the entries
+        """
+        if not entries:
+            return []
+
+        request = _PendingWrite(entries)
+        with self._commit_cond:
+            self._pending.append(request)
+            while request.seqs is None and request.error is None:
+                if self._committing:
+                    self._commit_cond.wait()
+                    continue
+
+                self._committing = True
+                batch, self._pending = self._pending, []
+                self._commit_cond.release()
+                try:
+                    self._commit(batch)
+                finally:
+                    self._commit_cond.acquire()
+                    self._committing = False
+                    self._commit_cond.notify_all()
+
+        if request.error is not None:
+            raise request.error
+        return request.seqs
+
+    def _commit(self, batch: List[_PendingWrite]):
+        """
+        Writes a batch of pending writes with a single flush (and fsync per policy).
+
+        The commit is all or nothing: if a write or flush fails, every record of
+        the batch is removed from the segments and the ring buffer before the
+        error is reported, so a caller retrying does not duplicate entries.
+        """
+        try:
+            with self._locked():
+                active = self.segments[-1]
+                checkpoint = (
+                    active.size,
+                    active.next_offset,
+                    len(active.index),
+                    active.last_timestamp,
+                )
+                try:
+                    for request in batch:
+                        request.seqs = [
+                            self._append(entry) for entry in request.entries
+                        ]
+                    self.segments[-1].flush(fsync=self._should_fsync())
+                except Exception:
+                    self._rollback(active, *checkpoint)
+                    raise
+                self._record_commit(sum(len(request.entries) for request in batch))
+        except Exception as e:
+            for request in batch:
+                request.seqs = None
+                request.error = e
+
+    def _rollback(
+        self,
+        active: Segment,
+        size: int,
+        next_offset: int,
+        index_entries: int,
+        last_timestamp: Optional[str],
+    ):
+        """Undoes a failed commit that started on the `active` segment."""
+        # Segments rolled over to during the commit hold only its records
+        while (
+            self.segments
+            and self.segments[-1] is not active
+            and self.segments[-1].base_offset >= next_offset
+        ):
+            segment = self.segments.pop()
+            segment.discard()
+            segment.delete()
+        if self.segments and self.segments[-1] is active:
+            active.rollback(size, next_offset, index_entries)
+            active.last_timestamp = last_timestamp
+        elif not self.segments:
+            # Retention deleted the segment the commit started on
+            self.segments.append(self._new_segment(next_offset))
+        while self.recent and self.recent[-1]["seq"] >= next_offset:
+            self.recent.pop()
+
+    def _record_commit(self, count: int):
+        now = time.monotonic()
+        self._enqueued += count
+        self._commits += 1
+        self._recent_commits.append((now, count))
+        while now - self._recent_commits[0][0] > self.THROUGHPUT_WINDOW_SECONDS:
+            self._recent_commits.popleft()
+
+    def _should_fsync(self) -> bool:
+        if self.fsync_policy == "always":
+            return True
+        if self.fsync_policy == "interval":
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                self._last_fsync = now
+                return True
+        return False
+
+    def _append(self, data: Dict) -> int:
+        """Buffers one entry on the active segment. Caller holds `self.lock`."""
+        segment = self._active_segment()
         # Use timezone-aware UTC datetime
         data_with_timestamp = {
             **data,
             "timestamp": datetime.now(timezone.utc).isoformat(),
+            "seq": segment.next_offset,
         }
-        with self.lock, open(self.path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(data_with_timestamp) + "\n")
+        record = segment.encode(data_with_timestamp)
+        position = segment.size
+        segment.write(record)
 
-    def dequeue_all(self) -> List[Dict]:
-        entries = []
+        if not segment.index or (
+            position - segment.index[-1][1] >= self.index_interval_bytes
+        ):
+            segment.add_index_entry(
+                segment.next_offset, position, data_with_timestamp["timestamp"]
+            )
+
+        segment.size += len(record)
+        segment.next_offset += 1
+        segment.last_timestamp = data_with_timestamp["timestamp"]
+        segment.last_modified = time.time()
+        self.recent.append(data_with_timestamp)
+        return data_with_timestamp["seq"]
+
+    def stats(self) -> Dict:
+        """Returns write counters and enqueue throughput over the recent window."""
+        with self._locked(shared=True):
+            now = time.monotonic()
+            window = min(self.THROUGHPUT_WINDOW_SECONDS, now - self._started)
+            recent = sum(
+                count
+                for at, count in self._recent_commits
+                if now - at <= self.THROUGHPUT_WINDOW_SECONDS
+            )
+            return {
+                "next_seq": self.next_offset,
+                "segments": len(self.segments),
+                "enqueued": self._enqueued,
+                "commits": self._commits,
+                "avg_batch_size": (
+                    self._enqueued / self._commits if self._commits else 0
+                ),
+                "enqueues_per_second": recent / window if window > 0 else 0.0,
+                "fsync_policy": self.fsync_policy,
+                "record_format": self.record_format,
+                "recent_entries": len(self.recent),
+                "memory_reads": self._memory_reads,
+                "disk_reads": self._disk_reads,
+                "start_offset": self.log_start,
+                "consumer_groups": len(self.group_offsets),
+            }
+
+    def convert_segments(self, record_format: str) -> Dict[str, int]:
+        """
+        Rewrites every segment in `record_format`, rebuilding its index, and
+        makes it the format of new segments. Each segment is written to a
+        temporary file and swapped in with `os.replace`.
+
+        Other processes keep handles to the old files, so run this only while
+        no other process has the queue open.
+
+        Returns:
+            Dict[str, int]: Segments converted and total log size before and after
+        """
+        if record_format not in RECORD_FORMATS:
+            raise ValueError(f"Unknown record format: {record_format}")
+
+        with self._locked():
+            result = {"converted": 0, "bytes_before": 0, "bytes_after": 0}
+            segments = []
+            for segment in self.segments:
+                result["bytes_before"] += segment.size
+                if segment.record_format != record_format:
+                    segment = self._convert_segment(segment, record_format)
+                    result["converted"] += 1
+                result["bytes_after"] += segment.size
+                segments.append(segment)
+            self.segments = segments
+            self.record_format = record_format
+            return result
+
+    def _convert_segment(self, segment: Segment, record_format: str) -> Segment:
+        segment.close(fsync=True)
+        converted = Segment(self.directory, segment.base_offset, record_format)
+        temp_path = converted.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            for entry in segment.read():
+                f.write(converted.encode(entry))
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Drop the old index first, since its positions only match the old file
+        try:
+            os.remove(segment.index_path)
+        except FileNotFoundError:
+            pass
+        os.replace(temp_path, converted.path)
+        os.remove(segment.path)
+        return self._recover_segment(segment.base_offset, record_format)
+
+    def close(self):
+        """Flushes and closes the active segment."""
         with self.lock:
-            try:
-                with open(self.path, "r", encoding="utf-8") as f:
-                    entries = [json.loads(line.strip()) for line in f if line.strip()]
-            except FileNotFoundError:
-                pass  # No data yet
+            self.segments[-1].close(fsync=self.fsync_policy != "never")
 
-            # Clear the file
-            open(self.path, "w", encoding="utf-8").close()
+    def dequeue_all(self) -> List[Dict]:
+        """
+        Returns every entry and moves the log start past them.
+
+        Nothing is truncated: the new start offset is committed atomically and
+        segments are only deleted by compaction, once consumer groups have
+        acknowledged them too.
+        """
+        with self._locked():
+            entries = self._read_all()
+            self.start_offset = self.next_offset
+            self._save_offsets()
+            self._compact()
 
         return entries
 
+    def consume(
+        self, group: str, limit: Optional[int] = None
+    ) -> Tuple[List[Dict], int]:
+        """
+        Reads the entries a consumer group has not acknowledged yet.
+
+        A new group starts from the current log start. Reading does not move
+        the group's offset; call `ack` with the returned cursor once the
+        entries are processed, so a failed delivery is simply read again.
+
+        Args:
+            group (str): Consumer group name
+            limit (int, optional): Maximum number of entries to return
+
+        Returns:
+            Tuple[List[Dict], int]: The entries and the cursor to acknowledge
+        """
+        with self._locked(shared=True):
+            if group in self.group_offsets:
+                return self._entries_after_offset(
+                    self.group_offsets[group], limit, self.segments[0].base_offset
+                )
+
+        with self._locked():
+            if group not in self.group_offsets:
+                self.group_offsets[group] = self.log_start
+                self._save_offsets()
+            return self._entries_after_offset(
+                self.group_offsets[group], limit, self.segments[0].base_offset
+            )
+
+    def ack(self, group: str, cursor: int) -> int:
+        """
+        Commits a consumer group's offset: every entry before `cursor` is
+        processed. Offsets never move backwards; an unknown group is
+        registered at `cursor`.
+
+        Returns:
+            int: The group's committed offset
+        """
+        with self._locked():
+            if cursor > self.next_offset:
+                raise ValueError(
+                    f"Cursor {cursor} is past the end of the log ({self.next_offset})"
+                )
+            committed = max(self.group_offsets.get(group, cursor), cursor)
+            if self.group_offsets.get(group) != committed:
+                self.group_offsets[group] = committed
+                self._save_offsets()
+                self._compact()
+            return committed
+
+    def remove_group(self, group: str) -> bool:
+        """
+        Unregisters a consumer group so it no longer holds back compaction.
+
+        Returns:
+            bool: True if the group existed
+        """
+        with self._locked():
+            if self.group_offsets.pop(group, None) is None:
+                return False
+            self._save_offsets()
+            self._compact()
+            return True
+
+    def consumer_groups(self) -> Dict[str, Dict[str, int]]:
+        """Returns each group's committed offset and how many entries it lags."""
+        with self._locked(shared=True):
+            return {
+                group: {
+                    "committed": offset,
+                    "lag": max(self.next_offset - offset, 0),
+                }
+                for group, offset in self.group_offsets.items()
+            }
+
+    def _recent_covers_log(self) -> bool:
+        """True when the ring buffer holds every entry still in the log."""
+        if not self.recent:
+            return self.next_offset == self.log_start
+        return self.recent[0]["seq"] <= self.log_start
+
     def get_entries_after_timestamp(self, timestamp: str) -> List[Dict]:
         """
         Retrieves all entries with timestamps after the specified timestamp.
 
+        Served from the in-memory ring buffer when it reaches back to
+        `timestamp`. Otherwise, segments whose last entry is not newer than
+        `timestamp` are skipped and the sparse index is used to seek into the
+        first relevant segment.
+
         Args:
             timestamp (str): ISO format timestamp to filter entries
 
         Returns:
             List[Dict]: List of entries after the specified timestamp
         """
+        with self._locked(shared=True):
+            if self._recent_covers_log() or (
+                self.recent and self.recent[0].get("timestamp", "") <= timestamp
+            ):
+                self._memory_reads += 1
+                entries = []
+                for entry in reversed(self.recent):
+                    if entry.get("timestamp", "") <= timestamp:
+                        break
+                    if entry["seq"] < self.log_start:
+                        break
+                    entries.append(entry)
+                entries.reverse()
+                return entries
+
+            self._disk_reads += 1
+            return self._read_after_timestamp_from_disk(timestamp)
+
+    def _read_after_timestamp_from_disk(self, timestamp: str) -> List[Dict]:
         entries = []
-        try:
-            with self.lock, open(self.path, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip():
-                        entry = json.loads(line.strip())
-                        if entry.get("timestamp", "") > timestamp:
-                            entries.append(entry)
-        except FileNotFoundError:
-            pass  # No data yet
+        log_start = self.log_start
+        for segment in self.segments:
+            if segment.last_timestamp is None or segment.next_offset <= log_start:
+                continue
+            if segment.last_timestamp <= timestamp:
+                continue
+            for entry in segment.read_after_timestamp(timestamp):
+                if entry["seq"] >= log_start:
+                    entries.append(entry)
 
         return entries
 
+    def get_entries_after_offset(
+        self, cursor: int, limit: Optional[int] = None
+    ) -> Tuple[List[Dict], int]:
+        """
+        Retrieves entries whose sequence number is at or after `cursor`.
+
+        Served from the in-memory ring buffer when it still holds `cursor`.
+        Otherwise the segment holding `cursor` is found by its base offset and
+        the sparse index is used to seek into it, so only new entries are
+        parsed. A cursor older than the retained log starts from the oldest
+        retained entry.
+
+        Args:
+            cursor (int): Sequence number of the first entry to return
+            limit (int, optional): Maximum number of entries to return
+
+        Returns:
+            Tuple[List[Dict], int]: The entries and the cursor to pass next time
+        """
+        with self._locked(shared=True):
+            return self._entries_after_offset(cursor, limit, self.log_start)
+
+    def _entries_after_offset(
+        self, cursor: int, limit: Optional[int], floor: int
+    ) -> Tuple[List[Dict], int]:
+        cursor = max(cursor, floor)
+        if cursor >= self.next_offset:
+            return [], cursor
+
+        if self.recent and cursor >= self.recent[0]["seq"]:
+            self._memory_reads += 1
+            start = cursor - self.recent[0]["seq"]
+            stop = start + limit if limit is not None else None
+            entries = list(islice(self.recent, start, stop))
+            return entries, entries[-1]["seq"] + 1 if entries else cursor
+
+        self._disk_reads += 1
+        return self._read_after_offset_from_disk(cursor, limit)
+
+    def _read_after_offset_from_disk(
+        self, cursor: int, limit: Optional[int] = None
+    ) -> Tuple[List[Dict], int]:
+        entries = []
+        next_cursor = cursor
+        first = bisect_right([s.base_offset for s in self.segments], cursor) - 1
+        for segment in self.segments[max(first, 0) :]:
+            if segment.next_offset <= cursor:
+                continue
+            offset, position = segment.seek_offset(cursor)
+            for entry in segment.read(offset, position):
+                if entry["seq"] < cursor:
+                    continue
+                if limit is not None and len(entries) >= limit:
+                    return entries, next_cursor
+                entries.append(entry)
+                next_cursor = entry["seq"] + 1
+
+        return entries, next_cursor
+
     def dequeue_without_removal(self) -> List[Dict]:
         """
         Retrieves all entries without clearing the file.
@@ -64,11 +1166,14 @@ class FileQueue:
         Returns:
             List[Dict]: All entries in the queue
         """
-        entries = []
-        try:
-            with self.lock, open(self.path, "r", encoding="utf-8") as f:
-                entries = [json.loads(line.strip()) for line in f if line.strip()]
-        except FileNotFoundError:
-            pass  # No data yet
+        with self._locked(shared=True):
+            return self._read_all()
 
-        return entries
+    def _read_all(self) -> List[Dict]:
+        if self._recent_covers_log():
+            self._memory_reads += 1
+            start = self.log_start
+            return [entry for entry in self.recent if entry["seq"] >= start]
+
+        self._disk_reads += 1
+        return self._read_after_offset_from_disk(self.log_start)[0]
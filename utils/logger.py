@@ -15,6 +15,10 @@ class Logger:
         self.logger = logging.getLogger(name)
         self.logger.setLevel(level)
 
+        # Loggers are shared per name, so only attach handlers once
+        if self.logger.handlers:
+            return
+
         # Formatter
         formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
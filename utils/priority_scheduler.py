@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+import itertools
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class SchedulerOverloaded(Exception):
+    """Raised when a call arrives while the scheduler's queue is full."""
+
+
+class PriorityScheduler:
+    """
+    Runs coroutines with at most `max_concurrency` in flight.
+
+    Calls beyond that wait in a queue and start in priority order (lowest value
+    first, first-come first-served within a priority). Each call has a deadline
+    covering both its wait and its run; once it passes, the call is cancelled
+    and asyncio.TimeoutError is raised. When `max_queue` calls are already
+    waiting, new calls fail immediately with SchedulerOverloaded, so callers can
+    fall back instead of piling up.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._heap: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self._waited = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def run(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        priority: int = 0,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Runs `fn()` once a slot is free.
+
+        Args:
+            fn: Returns the coroutine to run
+            priority (int): Lower values start first
+            timeout (float, optional): Seconds from now until the deadline;
+                defaults to the scheduler's timeout (None waits forever)
+
+        Raises:
+            asyncio.TimeoutError: If the deadline passed while queued or running
+            SchedulerOverloaded: If the queue is full
+        """
+        loop = asyncio.get_running_loop()
+        timeout = timeout if timeout is not None else self.timeout
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        await self._acquire(priority, deadline)
+        try:
+            remaining = deadline - loop.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                raise asyncio.TimeoutError()
+            result = await asyncio.wait_for(fn(), remaining)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._release()
+
+        self.completed += 1
+        return result
+
+    async def _acquire(self, priority: int, deadline: Optional[float]):
+        if self.in_flight < self.max_concurrency and not self.queued:
+            self.in_flight += 1
+            self._record_wait(0.0)
+            return
+        if self.max_queue is not None and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerOverloaded(
+                f"{self.queued} calls already waiting for {self.max_concurrency} slots"
+            )
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._heap, (priority, next(self._order), future))
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        queued_at = loop.time()
+        try:
+            timeout = deadline - queued_at if deadline is not None else None
+            await asyncio.wait_for(future, timeout)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # A slot was handed over just as the caller gave up; pass it on
+                self._release()
+            else:
+                future.cancel()  # Skipped when the next slot frees up
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+            raise
+        finally:
+            self.queued -= 1
+        self._record_wait(loop.time() - queued_at)
+
+    def _release(self):
+        # Hand the slot straight to the most urgent live waiter
+        while self._heap:
+            _, _, future = heapq.heappop(self._heap)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _record_wait(self, waited: float):
+        self._waited += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns queue depth, in-flight calls, outcomes and queue wait times."""
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "max_concurrency": self.max_concurrency,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "average_wait_ms": (
+                self._total_wait / self._waited * 1000 if self._waited else 0.0
+            ),
+            "max_wait_ms": self._max_wait * 1000,
+        }
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Lookup states returned by TTLCache.get
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a per-entry TTL.
+
+    Expired entries are kept for an extra `stale_ttl` seconds so callers can
+    serve them while refreshing in the background (stale-while-revalidate).
+    """
+
+    def __init__(self, max_size: int = 1024, stale_ttl: float = 0):
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[str, Optional[Any]]:
+        """
+        Looks up a key.
+
+        Returns:
+            Tuple[str, Any]: (FRESH | STALE | MISS, cached value or None)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS, None
+
+            value, expires_at = entry
+            if now < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return FRESH, value
+
+            if now < expires_at + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                return STALE, value
+
+            del self._entries[key]
+            self.misses += 1
+            return MISS, None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Stores a value for `ttl` seconds (forever if None), evicting the least
+        recently used entry when full.
+        """
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def items(self) -> List[Tuple[Hashable, Any, Optional[float]]]:
+        """
+        Returns the unexpired entries, least recently used first.
+
+        Returns:
+            List[Tuple]: (key, value, seconds until expiry or None if it never expires)
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value, expires_at - now if expires_at != float("inf") else None)
+                for key, (value, expires_at) in self._entries.items()
+                if now < expires_at
+            ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (
+                    (self.hits + self.stale_hits) / lookups if lookups else 0.0
+                ),
+            }